@@ -6,11 +6,14 @@ Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
 The higher power that governs the conversion logic.
 """
 
+import functools
+import operator
 import os
 import re
+import string
 import sys
 import traceback
-from typing import Iterable, NamedTuple, Optional
+from typing import Callable, Iterable, Iterator, Optional, Union
 
 from conwaymd._version import __version__
 from conwaymd.bases import Replacement, ReplacementWithSubstitutions
@@ -38,7 +41,16 @@ from conwaymd.employables import (
 from conwaymd.exceptions import MissingAttributeException
 from conwaymd.idioms import build_block_tag_regex
 from conwaymd.references import ReferenceMaster
-from conwaymd.utilities import none_to_empty_string
+from conwaymd.utilities import compose_translation_tables, none_to_empty_string
+
+FLAG_NAME_CHARACTERS = frozenset(string.ascii_uppercase + '_')
+TAG_NAME_CHARACTERS = frozenset(string.ascii_lowercase + string.digits)
+WHITESPACE_ONLY_PATTERN_COMPILED = re.compile(pattern=r'[\s]*', flags=re.ASCII)
+
+# As found in the class namespace: a `staticmethod` taking
+# (replacement, attribute_value, rules_file_name, line_number_range_start, line_number),
+# or a function taking (authority, replacement, ...) likewise, both returning None
+UnboundStageMethod = Union[staticmethod, Callable[..., None]]
 
 
 class ReplacementAuthority:
@@ -61,16 +73,24 @@ class ReplacementAuthority:
     _opened_file_names: list[str]
     _replacement_from_id: dict[str, 'Replacement']
     _root_replacement_id: Optional[str]
-    _replacement_queue: list['Replacement']
+    _queue_first_id: Optional[str]
+    _queue_next_id_from_id: dict[str, Optional[str]]
+    _queue_previous_id_from_id: dict[str, Optional[str]]
     _reference_master: 'ReferenceMaster'
+    _interpolation_values_from_cmd_name: dict[str, tuple[dict[str, str], dict[str, str]]]
+    _flag_bit_from_name: dict[str, int]
     _verbose_mode_enabled: bool
 
     def __init__(self, cmd_file_name: str, verbose_mode_enabled: bool):
         self._opened_file_names = [cmd_file_name]
         self._replacement_from_id = {}
         self._root_replacement_id = None
-        self._replacement_queue = []
+        self._queue_first_id = None
+        self._queue_next_id_from_id = {}
+        self._queue_previous_id_from_id = {}
         self._reference_master = ReferenceMaster()
+        self._interpolation_values_from_cmd_name = {}
+        self._flag_bit_from_name = {}  # bits are assigned by replacements on commit, see `Replacement.get_flag_bit`
         self._verbose_mode_enabled = verbose_mode_enabled
 
     @staticmethod
@@ -90,27 +110,7 @@ class ReplacementAuthority:
 
     @staticmethod
     def is_whitespace_only(line: str) -> bool:
-        return bool(re.fullmatch(pattern=r'[\s]*', string=line, flags=re.ASCII))
-
-    @staticmethod
-    def is_comment(line: str) -> bool:
-        return line.startswith('#')
-
-    @staticmethod
-    def compute_rules_inclusion_match(line: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [<][ ]
-                    (?:
-                        [/] (?P<included_file_name> [\S][\s\S]*? )
-                            |
-                        (?P<included_file_name_relative> [\S][\s\S]*? )
-                    )
-                [\s]*
-            ''',
-            string=line,
-            flags=re.ASCII | re.VERBOSE,
-        )
+        return bool(WHITESPACE_ONLY_PATTERN_COMPILED.fullmatch(line))
 
     def process_rules_inclusion_line(self, rules_inclusion_match: re.Match,
                                      rules_file_name: str, cmd_name: str, line_number: int):
@@ -143,18 +143,6 @@ class ReplacementAuthority:
         self._opened_file_names.append(included_file_name)
         self.legislate(replacement_rules, rules_file_name=included_file_name, cmd_name=cmd_name)
 
-    @staticmethod
-    def compute_class_declaration_match(line: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                (?P<class_name> [A-Za-z]+ ) [:]
-                [\s]+
-                [#] (?P<id_> [a-z0-9-.]+ )
-            ''',
-            string=line,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     def process_class_declaration_line(self, class_declaration_match: re.Match,
                                        rules_file_name: str, line_number: int) -> 'PostClassDeclarationState':
         class_name = class_declaration_match.group('class_name')
@@ -208,18 +196,7 @@ class ReplacementAuthority:
 
         line_number_range_start = line_number
 
-        return PostClassDeclarationState(class_name, replacement, line_number_range_start)
-
-    @staticmethod
-    def compute_attribute_declaration_match(line: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [-][ ] (?P<attribute_name> [a-z_]+ ) [:]
-                (?P<partial_attribute_value> [\s\S]* )
-            ''',
-            string=line,
-            flags=re.ASCII | re.VERBOSE,
-        )
+        return class_name, replacement, line_number_range_start
 
     @staticmethod
     def process_attribute_declaration_line(attribute_declaration_match: re.Match, class_name: str,
@@ -231,7 +208,7 @@ class ReplacementAuthority:
                                              rules_file_name, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        attribute_name = attribute_declaration_match.group('attribute_name')
+        attribute_name = sys.intern(attribute_declaration_match.group('attribute_name'))
         if attribute_name not in replacement.attribute_names:
             ReplacementAuthority.print_error(f'unrecognised attribute `{attribute_name}` for `{class_name}`',
                                              rules_file_name, line_number)
@@ -242,15 +219,7 @@ class ReplacementAuthority:
 
         line_number_range_start = line_number
 
-        return PostAttributeDeclarationState(attribute_name, attribute_value, line_number_range_start)
-
-    @staticmethod
-    def compute_substitution_declaration_match(line: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'[*][ ] (?P<partial_substitution> [\s\S]* )',
-            string=line,
-            flags=re.ASCII | re.VERBOSE,
-        )
+        return attribute_name, attribute_value, line_number_range_start
 
     @staticmethod
     def process_substitution_declaration_line(replacement: Optional['Replacement'],
@@ -267,15 +236,7 @@ class ReplacementAuthority:
 
         line_number_range_start = line_number
 
-        return PostSubstitutionDeclarationState(substitution, line_number_range_start)
-
-    @staticmethod
-    def compute_continuation_match(line: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'(?P<continuation> [\s]+ [\S][\s\S]* )',
-            string=line,
-            flags=re.ASCII | re.VERBOSE,
-        )
+        return substitution, line_number_range_start
 
     @staticmethod
     def process_continuation_line(continuation_match: re.Match, attribute_name: Optional[str],
@@ -293,34 +254,14 @@ class ReplacementAuthority:
                                              rules_file_name, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        return PostContinuationState(attribute_value, substitution)
-
-    @staticmethod
-    def compute_allowed_flag_matches(attribute_value: str) -> Iterable[re.Match]:
-        return re.finditer(
-            pattern=r'''
-                (?P<whitespace_only> \A [\s]* \Z )
-                    |
-                (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
-                    |
-                [\s]*
-                (?:
-                    (?P<flag_letter> [a-z] ) = (?P<flag_name> [A-Z_]+ ) (?= [\s] | \Z )
-                        |
-                    (?P<invalid_syntax> [\S]+ )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
+        return attribute_value, substitution
 
     @staticmethod
     def stage_allowed_flags(replacement: 'Replacement', attribute_value: str,
                             rules_file_name: str, line_number_range_start: int, line_number: int):
         flag_name_from_letter: dict[str, str] = {}
 
-        for allowed_flag_match in ReplacementAuthority.compute_allowed_flag_matches(attribute_value):
+        for allowed_flag_match in compute_allowed_flag_matches(attribute_value):
             if allowed_flag_match.group('whitespace_only') is not None:
                 ReplacementAuthority.print_error(f'invalid specification `` for attribute `allowed_flags`',
                                                  rules_file_name, line_number_range_start, line_number)
@@ -343,26 +284,10 @@ class ReplacementAuthority:
 
         replacement.flag_name_from_letter = flag_name_from_letter
 
-    @staticmethod
-    def compute_apply_mode_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<apply_mode> SIMULTANEOUS | SEQUENTIAL )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                    )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE
-        )
-
     @staticmethod
     def stage_apply_mode(replacement: 'Replacement', attribute_value: str,
                          rules_file_name: str, line_number_range_start: int, line_number: int):
-        apply_mode_match = ReplacementAuthority.compute_apply_mode_match(attribute_value)
+        apply_mode_match = compute_apply_mode_match(attribute_value)
 
         invalid_value = apply_mode_match.group('invalid_value')
         if invalid_value is not None:
@@ -373,30 +298,10 @@ class ReplacementAuthority:
         apply_mode = apply_mode_match.group('apply_mode')
         replacement.apply_substitutions_simultaneously = apply_mode == 'SIMULTANEOUS'
 
-    @staticmethod
-    def compute_attribute_specifications_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<empty_keyword> EMPTY )
-                        |
-                    (?P<attribute_specifications> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_attribute_specifications(replacement: 'Replacement', attribute_value: str,
                                        rules_file_name: str, line_number_range_start: int, line_number: int):
-        attribute_specifications_match = ReplacementAuthority.compute_attribute_specifications_match(attribute_value)
+        attribute_specifications_match = compute_attribute_specifications_match(attribute_value)
 
         invalid_value = attribute_specifications_match.group('invalid_value')
         if invalid_value is not None:
@@ -416,26 +321,10 @@ class ReplacementAuthority:
         attribute_specifications = attribute_specifications_match.group('attribute_specifications')
         replacement.attribute_specifications = attribute_specifications
 
-    @staticmethod
-    def compute_closing_delimiter_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<closing_delimiter> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_closing_delimiter(replacement: 'Replacement', attribute_value: str,
                                 rules_file_name: str, line_number_range_start: int, line_number: int):
-        closing_delimiter_match = ReplacementAuthority.compute_closing_delimiter_match(attribute_value)
+        closing_delimiter_match = compute_closing_delimiter_match(attribute_value)
 
         invalid_value = closing_delimiter_match.group('invalid_value')
         if invalid_value is not None:
@@ -446,30 +335,11 @@ class ReplacementAuthority:
         closing_delimiter = closing_delimiter_match.group('closing_delimiter')
         replacement.closing_delimiter = closing_delimiter
 
-    @staticmethod
-    def compute_concluding_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
-        return re.finditer(
-            pattern=r'''
-                (?P<whitespace_only> \A [\s]* \Z )
-                    |
-                (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
-                    |
-                (?:
-                    [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
-                        |
-                    (?P<invalid_syntax> [\S]+ )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     def stage_concluding_replacements(self, replacement: 'Replacement', attribute_value: str,
                                       rules_file_name: str, line_number_range_start: int, line_number: int):
         concluding_replacements: list['Replacement'] = []
 
-        concluding_replacement_matches = ReplacementAuthority.compute_concluding_replacement_matches(attribute_value)
+        concluding_replacement_matches = compute_concluding_replacement_matches(attribute_value)
         for concluding_replacement_match in concluding_replacement_matches:
             if concluding_replacement_match.group('whitespace_only') is not None:
                 ReplacementAuthority.print_error(f'invalid specification `` for attribute `concluding_replacements`',
@@ -502,30 +372,11 @@ class ReplacementAuthority:
 
         replacement.concluding_replacements = concluding_replacements
 
-    @staticmethod
-    def compute_content_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
-        return re.finditer(
-            pattern=r'''
-                (?P<whitespace_only> \A [\s]* \Z )
-                    |
-                (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
-                    |
-                (?:
-                    [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
-                        |
-                    (?P<invalid_syntax> [\S]+ )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     def stage_content_replacements(self, replacement: 'Replacement', attribute_value: str,
                                    rules_file_name: str, line_number_range_start: int, line_number: int):
         content_replacements: list['Replacement'] = []
 
-        for content_replacement_match in ReplacementAuthority.compute_content_replacement_matches(attribute_value):
+        for content_replacement_match in compute_content_replacement_matches(attribute_value):
             if content_replacement_match.group('whitespace_only') is not None:
                 ReplacementAuthority.print_error(f'invalid specification `` for attribute `content_replacements`',
                                                  rules_file_name, line_number_range_start, line_number)
@@ -557,33 +408,12 @@ class ReplacementAuthority:
 
         replacement.content_replacements = content_replacements
 
-    @staticmethod
-    def compute_delimiter_conversion_matches(attribute_value: str) -> Iterable[re.Match]:
-        return re.finditer(
-            pattern=r'''
-                (?P<whitespace_only> \A [\s]* \Z )
-                    |
-                [\s]*
-                (?:
-                    (?P<delimiter>
-                    (?P<delimiter_character> [\S] ) (?P=delimiter_character)?
-                )
-                    = (?P<tag_name> [a-z0-9]+ ) (?= [\s] | \Z )
-                    |
-                (?P<invalid_syntax> [\S]+ )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_delimiter_conversion(replacement: 'Replacement', attribute_value: str,
                                    rules_file_name: str, line_number_range_start: int, line_number: int):
         tag_name_from_delimiter_length_from_character: dict[str, dict[int, str]] = {}
 
-        for delimiter_conversion_match in ReplacementAuthority.compute_delimiter_conversion_matches(attribute_value):
+        for delimiter_conversion_match in compute_delimiter_conversion_matches(attribute_value):
             if delimiter_conversion_match.group('whitespace_only') is not None:
                 ReplacementAuthority.print_error(f'invalid specification `` for attribute `delimiter_conversion`',
                                                  rules_file_name, line_number_range_start, line_number)
@@ -608,28 +438,10 @@ class ReplacementAuthority:
 
         replacement.tag_name_from_delimiter_length_from_character = tag_name_from_delimiter_length_from_character
 
-    @staticmethod
-    def compute_ending_pattern_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<ending_pattern> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_ending_pattern(replacement: 'Replacement', attribute_value: str,
                              rules_file_name: str, line_number_range_start: int, line_number: int):
-        ending_pattern_match = ReplacementAuthority.compute_ending_pattern_match(attribute_value)
+        ending_pattern_match = compute_ending_pattern_match(attribute_value)
 
         invalid_value = ending_pattern_match.group('invalid_value')
         if invalid_value is not None:
@@ -657,28 +469,10 @@ class ReplacementAuthority:
 
         replacement.ending_pattern = ending_pattern
 
-    @staticmethod
-    def compute_epilogue_delimiter_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<epilogue_delimiter> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_epilogue_delimiter(replacement: 'Replacement', attribute_value: str,
                                  rules_file_name: str, line_number_range_start: int, line_number: int):
-        epilogue_delimiter_match = ReplacementAuthority.compute_epilogue_delimiter_match(attribute_value)
+        epilogue_delimiter_match = compute_epilogue_delimiter_match(attribute_value)
 
         invalid_value = epilogue_delimiter_match.group('invalid_value')
         if invalid_value is not None:
@@ -692,99 +486,47 @@ class ReplacementAuthority:
         epilogue_delimiter = epilogue_delimiter_match.group('epilogue_delimiter')
         replacement.epilogue_delimiter = epilogue_delimiter
 
-    @staticmethod
-    def compute_extensible_delimiter_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<extensible_delimiter>
-                        (?P<extensible_delimiter_character> [\S] )
-                        (?P=extensible_delimiter_character)*
-                    )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_extensible_delimiter(replacement: 'Replacement', attribute_value: str,
                                    rules_file_name: str, line_number_range_start: int, line_number: int):
-        extensible_delimiter_match = ReplacementAuthority.compute_extensible_delimiter_match(attribute_value)
-
-        invalid_value = extensible_delimiter_match.group('invalid_value')
-        if invalid_value is not None:
+        extensible_delimiter = attribute_value.strip(string.whitespace)
+        extensible_delimiter_character = extensible_delimiter[:1]
+
+        if (
+            extensible_delimiter_character == ''
+            or extensible_delimiter != extensible_delimiter_character * len(extensible_delimiter)
+        ):
+            invalid_value = extensible_delimiter
             ReplacementAuthority.print_error(
                 f'invalid value `{invalid_value}` not a character repeated for attribute `extensible_delimiter`',
                 rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        extensible_delimiter_character = extensible_delimiter_match.group('extensible_delimiter_character')
-        extensible_delimiter = extensible_delimiter_match.group('extensible_delimiter')
         extensible_delimiter_min_length = len(extensible_delimiter)
 
         replacement.extensible_delimiter_character = extensible_delimiter_character
         replacement.extensible_delimiter_min_length = extensible_delimiter_min_length
 
-    @staticmethod
-    def compute_negative_flag_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<negative_flag_name> [A-Z_]+ )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_negative_flag(replacement: 'Replacement', attribute_value: str,
                             rules_file_name: str, line_number_range_start: int, line_number: int):
-        negative_flag_match = ReplacementAuthority.compute_negative_flag_match(attribute_value)
+        negative_flag_name = attribute_value.strip(string.whitespace)
 
-        invalid_value = negative_flag_match.group('invalid_value')
-        if invalid_value is not None:
+        if negative_flag_name == 'NONE':
+            return
+
+        if negative_flag_name == '' or not FLAG_NAME_CHARACTERS.issuperset(negative_flag_name):
+            invalid_value = negative_flag_name
             ReplacementAuthority.print_error(f'invalid value `{invalid_value}` for attribute `negative_flag`',
                                              rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        if negative_flag_match.group('none_keyword') is not None:
-            return
-
-        negative_flag_name = negative_flag_match.group('negative_flag_name')
         replacement.negative_flag_name = negative_flag_name
 
-    @staticmethod
-    def compute_opening_delimiter_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<opening_delimiter> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_opening_delimiter(replacement: 'Replacement', attribute_value: str,
                                 rules_file_name: str, line_number_range_start: int, line_number: int):
-        opening_delimiter_match = ReplacementAuthority.compute_opening_delimiter_match(attribute_value)
+        opening_delimiter_match = compute_opening_delimiter_match(attribute_value)
 
         invalid_value = opening_delimiter_match.group('invalid_value')
         if invalid_value is not None:
@@ -795,63 +537,26 @@ class ReplacementAuthority:
         opening_delimiter = opening_delimiter_match.group('opening_delimiter')
         replacement.opening_delimiter = opening_delimiter
 
-    @staticmethod
-    def compute_positive_flag_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<positive_flag_name> [A-Z_]+ )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_positive_flag(replacement: 'Replacement', attribute_value: str,
                             rules_file_name: str, line_number_range_start: int, line_number: int):
-        positive_flag_match = ReplacementAuthority.compute_positive_flag_match(attribute_value)
+        positive_flag_name = attribute_value.strip(string.whitespace)
 
-        invalid_value = positive_flag_match.group('invalid_value')
-        if invalid_value is not None:
+        if positive_flag_name == 'NONE':
+            return
+
+        if positive_flag_name == '' or not FLAG_NAME_CHARACTERS.issuperset(positive_flag_name):
+            invalid_value = positive_flag_name
             ReplacementAuthority.print_error(f'invalid value `{invalid_value}` for attribute `positive_flag`',
                                              rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        if positive_flag_match.group('none_keyword') is not None:
-            return
-
-        positive_flag_name = positive_flag_match.group('positive_flag_name')
         replacement.positive_flag_name = positive_flag_name
 
-    @staticmethod
-    def compute_prohibited_content_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<prohibited_content> BLOCKS | ANCHORED_BLOCKS )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_prohibited_content(replacement: 'Replacement', attribute_value: str,
                                  rules_file_name: str, line_number_range_start: int, line_number: int):
-        prohibited_content_match = ReplacementAuthority.compute_prohibited_content_match(attribute_value)
+        prohibited_content_match = compute_prohibited_content_match(attribute_value)
 
         invalid_value = prohibited_content_match.group('invalid_value')
         if invalid_value is not None:
@@ -867,28 +572,10 @@ class ReplacementAuthority:
         prohibited_content_regex = build_block_tag_regex(require_anchoring)
         replacement.prohibited_content_regex = prohibited_content_regex
 
-    @staticmethod
-    def compute_prologue_delimiter_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<prologue_delimiter> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_prologue_delimiter(replacement: 'Replacement', attribute_value: str,
                                  rules_file_name: str, line_number_range_start: int, line_number: int):
-        prologue_delimiter_match = ReplacementAuthority.compute_prologue_delimiter_match(attribute_value)
+        prologue_delimiter_match = compute_prologue_delimiter_match(attribute_value)
 
         invalid_value = prologue_delimiter_match.group('invalid_value')
         if invalid_value is not None:
@@ -902,31 +589,9 @@ class ReplacementAuthority:
         prologue_delimiter = prologue_delimiter_match.group('prologue_delimiter')
         replacement.prologue_delimiter = prologue_delimiter
 
-    @staticmethod
-    def compute_queue_position_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<root_keyword> ROOT )
-                        |
-                    (?P<queue_position_type> BEFORE | AFTER )
-                    [ ]
-                    [#] (?P<queue_reference_id> [a-z-.]+ )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     def stage_queue_position(self, replacement: 'Replacement', attribute_value: str,
                              rules_file_name: str, line_number_range_start: int, line_number: int):
-        queue_position_match = ReplacementAuthority.compute_queue_position_match(attribute_value)
+        queue_position_match = compute_queue_position_match(attribute_value)
 
         invalid_value = queue_position_match.group('invalid_value')
         if invalid_value is not None:
@@ -962,7 +627,7 @@ class ReplacementAuthority:
                                              rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        if queue_reference_replacement not in self._replacement_queue:
+        if queue_reference_id not in self._queue_next_id_from_id:
             ReplacementAuthority.print_error(f'replacement `#{queue_reference_id}` not in queue',
                                              rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
@@ -970,30 +635,11 @@ class ReplacementAuthority:
         replacement.queue_position_type = queue_position_type
         replacement.queue_reference_replacement = queue_reference_replacement
 
-    @staticmethod
-    def compute_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
-        return re.finditer(
-            pattern=r'''
-                (?P<whitespace_only> \A [\s]* \Z )
-                    |
-                (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
-                    |
-                (?:
-                    [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
-                        |
-                    (?P<invalid_syntax> [\S]+ )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     def stage_replacements(self, replacement: 'Replacement', attribute_value: str,
                            rules_file_name: str, line_number_range_start: int, line_number: int):
         matched_replacements: list['Replacement'] = []
 
-        for replacement_match in ReplacementAuthority.compute_replacement_matches(attribute_value):
+        for replacement_match in compute_replacement_matches(attribute_value):
             if replacement_match.group('whitespace_only') is not None:
                 ReplacementAuthority.print_error(f'invalid specification `` for attribute `replacements`',
                                                  rules_file_name, line_number_range_start, line_number)
@@ -1024,26 +670,10 @@ class ReplacementAuthority:
 
         replacement.replacements = matched_replacements
 
-    @staticmethod
-    def compute_starting_pattern_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<starting_pattern> [\S][\s\S]*? )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_starting_pattern(replacement: 'Replacement', attribute_value: str,
                                rules_file_name: str, line_number_range_start: int, line_number: int):
-        starting_pattern_match = ReplacementAuthority.compute_starting_pattern_match(attribute_value)
+        starting_pattern_match = compute_starting_pattern_match(attribute_value)
 
         invalid_value = starting_pattern_match.group('invalid_value')
         if invalid_value is not None:
@@ -1068,26 +698,10 @@ class ReplacementAuthority:
 
         replacement.starting_pattern = starting_pattern
 
-    @staticmethod
-    def compute_syntax_type_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<syntax_type> BLOCK | INLINE )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_syntax_type(replacement: 'Replacement', attribute_value: str,
                           rules_file_name: str, line_number_range_start: int, line_number: int):
-        syntax_type_match = ReplacementAuthority.compute_syntax_type_match(attribute_value)
+        syntax_type_match = compute_syntax_type_match(attribute_value)
 
         invalid_value = syntax_type_match.group('invalid_value')
         if invalid_value is not None:
@@ -1098,79 +712,27 @@ class ReplacementAuthority:
         syntax_type = syntax_type_match.group('syntax_type')
         replacement.syntax_type_is_block = syntax_type == 'BLOCK'
 
-    @staticmethod
-    def compute_tag_name_match(attribute_value: str) -> Optional[re.Match]:
-        return re.fullmatch(
-            pattern=r'''
-                [\s]*
-                (?:
-                    (?P<none_keyword> NONE )
-                        |
-                    (?P<tag_name> [a-z0-9]+ )
-                        |
-                    (?P<invalid_value> [\s\S]*? )
-                )
-                [\s]*
-            ''',
-            string=attribute_value,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_tag_name(replacement: 'Replacement', attribute_value: str,
                        rules_file_name: str, line_number_range_start: int, line_number: int):
-        tag_name_match = ReplacementAuthority.compute_tag_name_match(attribute_value)
+        tag_name = attribute_value.strip(string.whitespace)
 
-        invalid_value = tag_name_match.group('invalid_value')
-        if invalid_value is not None:
+        if tag_name == 'NONE':
+            return
+
+        if tag_name == '' or not TAG_NAME_CHARACTERS.issuperset(tag_name):
+            invalid_value = tag_name
             ReplacementAuthority.print_error(f'invalid value `{invalid_value}` for attribute `tag_name`',
                                              rules_file_name, line_number_range_start, line_number)
             sys.exit(GENERIC_ERROR_EXIT_CODE)
 
-        if tag_name_match.group('none_keyword') is not None:
-            return
-
-        tag_name = tag_name_match.group('tag_name')
         replacement.tag_name = tag_name
 
-    @staticmethod
-    def compute_substitution_match(substitution: str) -> Optional[re.Match]:
-        substitution_delimiters: list[str] = re.findall(pattern='[-]{2,}[>]', string=substitution)
-        if len(substitution_delimiters) == 0:
-            return None
-
-        longest_substitution_delimiter = max(substitution_delimiters, key=len)
-        return re.fullmatch(
-            pattern=fr'''
-                [\s]*
-                    (?:
-                        "(?P<double_quoted_pattern> [\s\S]*? )"
-                            |
-                        '(?P<single_quoted_pattern> [\s\S]*? )'
-                            |
-                        (?P<bare_pattern> [\s\S]*? )
-                    )
-                [\s]*
-                    {re.escape(longest_substitution_delimiter)}
-                    [\s]*
-                    (?:
-                        "(?P<double_quoted_substitute> [\s\S]*? )"
-                            |
-                        '(?P<single_quoted_substitute> [\s\S]*? )'
-                            |
-                        (?P<bare_substitute> [\s\S]*? )
-                    )
-                [\s]*
-            ''',
-            string=substitution,
-            flags=re.ASCII | re.VERBOSE,
-        )
-
     @staticmethod
     def stage_ordinary_substitution(replacement: 'ReplacementWithSubstitutions', substitution: str,
                                     rules_file_name: str, interpolation_value_from_key: dict[str, str],
                                     line_number_range_start: int, line_number: int):
-        substitution_match = ReplacementAuthority.compute_substitution_match(substitution)
+        substitution_match = compute_substitution_match(substitution)
         if substitution_match is None:
             ReplacementAuthority.print_error(f'missing delimiter `-->` in substitution `{substitution}`',
                                              rules_file_name, line_number_range_start, line_number)
@@ -1205,8 +767,9 @@ class ReplacementAuthority:
     @staticmethod
     def stage_regex_substitution(replacement: 'ReplacementWithSubstitutions', substitution: str,
                                  rules_file_name: str, interpolation_value_from_key: dict[str, str],
+                                 escaped_interpolation_value_from_key: dict[str, str],
                                  line_number_range_start: int, line_number: int):
-        substitution_match = ReplacementAuthority.compute_substitution_match(substitution)
+        substitution_match = compute_substitution_match(substitution)
         if substitution_match is None:
             ReplacementAuthority.print_error(f'missing delimiter `-->` in substitution `{substitution}`',
                                              rules_file_name, line_number_range_start, line_number)
@@ -1233,7 +796,7 @@ class ReplacementAuthority:
                 substitute = substitution_match.group('bare_substitute')
 
         for interpolation_key, interpolation_value in interpolation_value_from_key.items():
-            pattern = pattern.replace(interpolation_key, re.escape(interpolation_value))
+            pattern = pattern.replace(interpolation_key, escaped_interpolation_value_from_key[interpolation_key])
             substitute = substitute.replace(interpolation_key, interpolation_value)
 
         try:
@@ -1254,16 +817,58 @@ class ReplacementAuthority:
 
         replacement.add_substitution(pattern, substitute)
 
+    def compute_interpolation_values(self, cmd_name: str) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        Compute the interpolation values for a CMD name, and their regex-escaped counterparts.
+
+        These are invariant for a given CMD name, so they are computed once and memoised.
+        """
+        try:
+            return self._interpolation_values_from_cmd_name[cmd_name]
+        except KeyError:
+            pass
+
+        interpolation_value_from_key = {
+            '{CMD_VERSION}': __version__,
+            '{CMD_NAME}': cmd_name,
+            '{CMD_BASENAME}': extract_basename(cmd_name),
+            '{CLEAN_URL}': make_clean_url(cmd_name),
+        }
+        escaped_interpolation_value_from_key = {
+            interpolation_key: re.escape(interpolation_value)
+            for interpolation_key, interpolation_value in interpolation_value_from_key.items()
+        }
+
+        interpolation_values = (interpolation_value_from_key, escaped_interpolation_value_from_key)
+        self._interpolation_values_from_cmd_name[cmd_name] = interpolation_values
+
+        return interpolation_values
+
+    @classmethod
+    @functools.cache
+    def get_stage_method_from_attribute_name(cls, replacement_class: type,
+                                             attribute_names: tuple[str, ...]) -> dict[str, UnboundStageMethod]:
+        """
+        Get the stage methods for the attributes of a replacement class, built once per class (across authorities).
+
+        The stage methods are unbound (see `UnboundStageMethod`), and are bound to an authority by `__get__`,
+        which binds a function and unwraps a `staticmethod`, so that both are called alike (see `stage`).
+        """
+        stage_method_from_attribute_name = {}
+        for attribute_name in attribute_names:
+            stage_method = vars(cls).get(f'stage_{attribute_name}')
+            if stage_method is not None:
+                stage_method_from_attribute_name[attribute_name] = stage_method
+
+        return stage_method_from_attribute_name
+
     def stage(self, class_name: str, replacement: 'Replacement',
               attribute_name: str, attribute_value: str, substitution: str,
               rules_file_name: str, cmd_name: str, line_number_range_start: int, line_number: int) -> 'PostStageState':
         if substitution is not None:  # staging a substitution
-            interpolation_value_from_key = {
-                '{CMD_VERSION}': __version__,
-                '{CMD_NAME}': cmd_name,
-                '{CMD_BASENAME}': extract_basename(cmd_name),
-                '{CLEAN_URL}': make_clean_url(cmd_name),
-            }
+            interpolation_value_from_key, escaped_interpolation_value_from_key = (
+                self.compute_interpolation_values(cmd_name)
+            )
 
             if class_name == 'OrdinaryDictionaryReplacement':
                 assert isinstance(replacement, ReplacementWithSubstitutions)
@@ -1274,6 +879,7 @@ class ReplacementAuthority:
                 assert isinstance(replacement, ReplacementWithSubstitutions)
                 ReplacementAuthority.stage_regex_substitution(replacement, substitution,
                                                               rules_file_name, interpolation_value_from_key,
+                                                              escaped_interpolation_value_from_key,
                                                               line_number_range_start, line_number)
             else:
                 ReplacementAuthority.print_error(f'class `{class_name}` does not allow substitutions',
@@ -1281,75 +887,20 @@ class ReplacementAuthority:
                 sys.exit(GENERIC_ERROR_EXIT_CODE)
 
         else:  # staging an attribute declaration
-            if attribute_name == 'allowed_flags':
-                ReplacementAuthority.stage_allowed_flags(replacement, attribute_value,
-                                                         rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'apply_mode':
-                ReplacementAuthority.stage_apply_mode(replacement, attribute_value,
-                                                      rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'attribute_specifications':
-                ReplacementAuthority.stage_attribute_specifications(replacement, attribute_value,
-                                                                    rules_file_name,
-                                                                    line_number_range_start, line_number)
-            elif attribute_name == 'closing_delimiter':
-                ReplacementAuthority.stage_closing_delimiter(replacement, attribute_value,
-                                                             rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'concluding_replacements':
-                self.stage_concluding_replacements(replacement, attribute_value,
-                                                   rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'content_replacements':
-                self.stage_content_replacements(replacement, attribute_value,
-                                                rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'delimiter_conversion':
-                ReplacementAuthority.stage_delimiter_conversion(replacement, attribute_value,
-                                                                rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'ending_pattern':
-                ReplacementAuthority.stage_ending_pattern(replacement, attribute_value,
-                                                          rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'epilogue_delimiter':
-                ReplacementAuthority.stage_epilogue_delimiter(replacement, attribute_value,
-                                                              rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'extensible_delimiter':
-                ReplacementAuthority.stage_extensible_delimiter(replacement, attribute_value,
-                                                                rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'negative_flag':
-                ReplacementAuthority.stage_negative_flag(replacement, attribute_value,
-                                                         rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'opening_delimiter':
-                ReplacementAuthority.stage_opening_delimiter(replacement, attribute_value,
-                                                             rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'positive_flag':
-                ReplacementAuthority.stage_positive_flag(replacement, attribute_value,
-                                                         rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'prohibited_content':
-                ReplacementAuthority.stage_prohibited_content(replacement, attribute_value,
-                                                              rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'prologue_delimiter':
-                ReplacementAuthority.stage_prologue_delimiter(replacement, attribute_value,
-                                                              rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'queue_position':
-                self.stage_queue_position(replacement, attribute_value,
-                                          rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'replacements':
-                self.stage_replacements(replacement, attribute_value,
-                                        rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'starting_pattern':
-                ReplacementAuthority.stage_starting_pattern(replacement, attribute_value,
-                                                            rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'syntax_type':
-                ReplacementAuthority.stage_syntax_type(replacement, attribute_value,
-                                                       rules_file_name, line_number_range_start, line_number)
-            elif attribute_name == 'tag_name':
-                ReplacementAuthority.stage_tag_name(replacement, attribute_value,
-                                                    rules_file_name, line_number_range_start, line_number)
-
-        return PostStageState(attribute_name=None, attribute_value=None, substitution=None,
-                              line_number_range_start=None)
+            stage_method = ReplacementAuthority.get_stage_method_from_attribute_name(
+                type(replacement),
+                replacement.attribute_names,
+            ).get(attribute_name)
+            if stage_method is not None:
+                stage_method.__get__(self)(replacement, attribute_value,
+                                           rules_file_name, line_number_range_start, line_number)
+
+        return None, None, None, None
 
     def commit(self, class_name: str, replacement: 'Replacement',
                rules_file_name: str, line_number: int) -> 'PostCommitState':
         try:
-            replacement.commit()
+            replacement.commit(self._flag_bit_from_name)
         except MissingAttributeException as exception:
             missing_attribute = exception.missing_attribute
             ReplacementAuthority.print_error(f'missing attribute `{missing_attribute}` for {class_name}',
@@ -1360,29 +911,69 @@ class ReplacementAuthority:
         self._replacement_from_id[id_] = replacement
 
         queue_position_type = replacement.queue_position_type
-        if queue_position_type is None:
-            pass
-        elif queue_position_type == 'ROOT':
+        if queue_position_type is None:  # not queued, which is the case for most replacements
+            return None, None, None, None, None, None
+
+        if queue_position_type == 'ROOT':
             self._root_replacement_id = id_
-            self._replacement_queue.append(replacement)
+            self._queue_first_id = id_
+            self._queue_next_id_from_id[id_] = None
+            self._queue_previous_id_from_id[id_] = None
+            return None, None, None, None, None, None
+
+        queue_reference_id = replacement.queue_reference_replacement.id_
+        if queue_position_type == 'BEFORE':
+            previous_id = self._queue_previous_id_from_id[queue_reference_id]
+            next_id = queue_reference_id
+        elif queue_position_type == 'AFTER':
+            previous_id = queue_reference_id
+            next_id = self._queue_next_id_from_id[queue_reference_id]
         else:
-            queue_reference_replacement = replacement.queue_reference_replacement
-            queue_reference_index = self._replacement_queue.index(queue_reference_replacement)
-            if queue_position_type == 'BEFORE':
-                insertion_index = queue_reference_index
-            elif queue_position_type == 'AFTER':
-                insertion_index = queue_reference_index + 1
-            else:
-                insertion_index = None
-            self._replacement_queue.insert(insertion_index, replacement)
+            previous_id = next_id = None
+
+        self._queue_previous_id_from_id[id_] = previous_id
+        self._queue_next_id_from_id[id_] = next_id
+
+        if previous_id is None:
+            self._queue_first_id = id_
+        else:
+            self._queue_next_id_from_id[previous_id] = id_
+
+        if next_id is not None:
+            self._queue_previous_id_from_id[next_id] = id_
+
+        return None, None, None, None, None, None
+
+    def flush(self, class_name: str, replacement: 'Replacement',
+              attribute_name: str, attribute_value: str, substitution: str,
+              rules_file_name: str, cmd_name: str, line_number_range_start: int, line_number: int,
+              commit_enabled: bool) -> 'PostFlushState':
+        """
+        Stage any pending attribute or substitution declaration, and (if enabled) commit any pending class declaration.
+        """
+        if attribute_name is not None or substitution is not None:
+            attribute_name, attribute_value, substitution, line_number_range_start = (
+                self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
+                           rules_file_name, cmd_name, line_number_range_start, line_number)
+            )
+        if commit_enabled and replacement is not None:
+            class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                self.commit(class_name, replacement, rules_file_name, line_number)
+            )
 
-        return PostCommitState(class_name=None, replacement=None, attribute_name=None, attribute_value=None,
-                               substitution=None, line_number_range_start=None)
+        return class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start
 
     def legislate(self, replacement_rules: str, rules_file_name: str, cmd_name: str):
-        if replacement_rules is None:
-            return
+        self.legislate_classified_lines(classify_rules_lines(replacement_rules), rules_file_name, cmd_name)
+
+    def legislate_classified_lines(self, classified_lines: Iterable['ClassifiedRulesLine'],
+                                   rules_file_name: str, cmd_name: str):
+        """
+        Legislate replacement rules that have already been classified line by line (see `classify_rules_lines`).
 
+        Classification depends only on the rules themselves,
+        so rules legislated for many CMD files (e.g. `STANDARD_RULES`) need only be classified once.
+        """
         class_name: Optional[str] = None
         replacement: Optional['Replacement'] = None
         attribute_name: Optional[str] = None
@@ -1391,87 +982,65 @@ class ReplacementAuthority:
         line_number_range_start: Optional[int] = None
         line_number: int = 0
 
-        for line_number, line in enumerate(replacement_rules.splitlines(), start=1):
-            if ReplacementAuthority.is_whitespace_only(line):
-                if attribute_name is not None or substitution is not None:
-                    attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
-                                   rules_file_name, cmd_name, line_number_range_start, line_number)
-                    )
-                if replacement is not None:
-                    class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.commit(class_name, replacement, rules_file_name, line_number)
-                    )
+        for line_number, line_type, line_match in classified_lines:
+            if line_type == 'BLANK':
+                class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                    self.flush(class_name, replacement, attribute_name, attribute_value, substitution,
+                               rules_file_name, cmd_name, line_number_range_start, line_number, commit_enabled=True)
+                )
                 continue
 
-            if ReplacementAuthority.is_comment(line):
+            if line_type == 'COMMENT':
                 continue
 
-            rules_inclusion_match = ReplacementAuthority.compute_rules_inclusion_match(line)
-            if rules_inclusion_match is not None:
-                if attribute_name is not None or substitution is not None:
-                    attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
-                                   rules_file_name, cmd_name, line_number_range_start, line_number)
-                    )
-                if replacement is not None:
-                    class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.commit(class_name, replacement, rules_file_name, line_number)
-                    )
-                self.process_rules_inclusion_line(rules_inclusion_match, rules_file_name, cmd_name, line_number)
+            if line_type == 'RULES_INCLUSION':
+                class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                    self.flush(class_name, replacement, attribute_name, attribute_value, substitution,
+                               rules_file_name, cmd_name, line_number_range_start, line_number, commit_enabled=True)
+                )
+                self.process_rules_inclusion_line(line_match, rules_file_name, cmd_name, line_number)
                 continue
 
-            class_declaration_match = ReplacementAuthority.compute_class_declaration_match(line)
-            if class_declaration_match is not None:
-                if attribute_name is not None or substitution is not None:
-                    attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
-                                   rules_file_name, cmd_name, line_number_range_start, line_number)
-                    )
-                if replacement is not None:
-                    class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.commit(class_name, replacement, rules_file_name, line_number)
-                    )
+            if line_type == 'CLASS_DECLARATION':
+                class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                    self.flush(class_name, replacement, attribute_name, attribute_value, substitution,
+                               rules_file_name, cmd_name, line_number_range_start, line_number, commit_enabled=True)
+                )
                 class_name, replacement, line_number_range_start = (
-                    self.process_class_declaration_line(class_declaration_match, rules_file_name, line_number)
+                    self.process_class_declaration_line(line_match, rules_file_name, line_number)
                 )
                 continue
 
-            attribute_declaration_match = ReplacementAuthority.compute_attribute_declaration_match(line)
-            if attribute_declaration_match is not None:
-                if attribute_name is not None or substitution is not None:
-                    attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
-                                   rules_file_name, cmd_name, line_number_range_start, line_number)
-                    )
+            if line_type == 'ATTRIBUTE_DECLARATION':
+                class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                    self.flush(class_name, replacement, attribute_name, attribute_value, substitution,
+                               rules_file_name, cmd_name, line_number_range_start, line_number, commit_enabled=False)
+                )
                 attribute_name, attribute_value, line_number_range_start = (
                     ReplacementAuthority.process_attribute_declaration_line(
-                        attribute_declaration_match, class_name, replacement, attribute_value,
+                        line_match, class_name, replacement, attribute_value,
                         rules_file_name, line_number,
                     )
                 )
                 continue
 
-            substitution_declaration_match = ReplacementAuthority.compute_substitution_declaration_match(line)
-            if substitution_declaration_match is not None:
-                if attribute_name is not None or substitution is not None:
-                    attribute_name, attribute_value, substitution, line_number_range_start = (
-                        self.stage(class_name, replacement, attribute_name, attribute_value, substitution,
-                                   rules_file_name, cmd_name, line_number_range_start, line_number)
-                    )
+            if line_type == 'SUBSTITUTION_DECLARATION':
+                class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start = (
+                    self.flush(class_name, replacement, attribute_name, attribute_value, substitution,
+                               rules_file_name, cmd_name, line_number_range_start, line_number, commit_enabled=False)
+                )
                 substitution, line_number_range_start = (
                     ReplacementAuthority.process_substitution_declaration_line(
-                        replacement, substitution_declaration_match, substitution,
+                        replacement, line_match, substitution,
                         rules_file_name, line_number,
                     )
                 )
                 continue
 
-            continuation_match = ReplacementAuthority.compute_continuation_match(line)
-            if continuation_match is not None:
+            if line_type == 'CONTINUATION':
                 attribute_value, substitution = (
                     ReplacementAuthority.process_continuation_line(
-                        continuation_match, attribute_name, attribute_value, substitution,
+                        line_match, attribute_name, attribute_value, substitution,
                         rules_file_name, line_number,
                     )
                 )
@@ -1488,56 +1057,582 @@ class ReplacementAuthority:
         if replacement is not None:
             self.commit(class_name, replacement, rules_file_name, line_number + 1)
 
+    def compute_replacement_queue(self) -> list['Replacement']:
+        """
+        Walk the queue links from the first queued replacement.
+
+        The queue is kept as links between IDs (rather than a list)
+        so that BEFORE and AFTER insertions do not have to search for the reference replacement.
+        """
+        replacement_queue = []
+
+        id_ = self._queue_first_id
+        while id_ is not None:
+            replacement_queue.append(self._replacement_from_id[id_])
+            id_ = self._queue_next_id_from_id[id_]
+
+        return replacement_queue
+
+    @staticmethod
+    def compute_apply_functions(replacement_queue: list['Replacement']) -> list[Callable[[str], str]]:
+        """
+        Compute the functions that apply the replacement queue.
+
+        Runs of consecutive ordinary dictionary replacements of single characters
+        are fused into a single `str.translate` pass (see `build_translation_table`),
+        so that the string is not rebuilt once for each of them.
+        """
+        apply_functions: list[Callable[[str], str]] = []
+        translation_table: Optional[dict[int, str]] = None
+
+        for replacement in replacement_queue:
+            if isinstance(replacement, OrdinaryDictionaryReplacement):
+                replacement_translation_table = replacement.build_translation_table()
+            else:
+                replacement_translation_table = None
+
+            if replacement_translation_table is not None:
+                if translation_table is None:
+                    translation_table = replacement_translation_table
+                else:
+                    translation_table = compose_translation_tables(translation_table, replacement_translation_table)
+                continue
+
+            if translation_table is not None:
+                apply_functions.append(operator.methodcaller('translate', translation_table))
+                translation_table = None
+
+            apply_functions.append(replacement.apply)
+
+        if translation_table is not None:
+            apply_functions.append(operator.methodcaller('translate', translation_table))
+
+        return apply_functions
+
     def execute(self, string: str) -> str:
+        replacement_queue = self.compute_replacement_queue()
+
         if self._verbose_mode_enabled:
             replacement_queue_ids = [
                 f'#{replacement.id_}'
-                for replacement in self._replacement_queue
+                for replacement in replacement_queue
             ]
             print(f'Replacement queue: {replacement_queue_ids}\n\n\n\n')
 
-        for replacement in self._replacement_queue:
-            string = replacement.apply(string)
+            apply_functions = [replacement.apply for replacement in replacement_queue]
+        else:
+            apply_functions = ReplacementAuthority.compute_apply_functions(replacement_queue)
+
+        for apply_function in apply_functions:
+            string = apply_function(string)
 
         return string  # HTMl
 
 
-class PostClassDeclarationState(NamedTuple):
-    class_name: str
-    replacement: 'Replacement'
-    line_number_range_start: int
+# The states below are plain tuples (rather than named tuples) since they are built once per rules line
+# and immediately unpacked by `legislate`.
+
+# (class_name, replacement, line_number_range_start)
+PostClassDeclarationState = tuple[str, 'Replacement', int]
+
+# (attribute_name, attribute_value, line_number_range_start)
+PostAttributeDeclarationState = tuple[str, str, int]
+
+# (substitution, line_number_range_start)
+PostSubstitutionDeclarationState = tuple[str, int]
+
+# (attribute_value, substitution)
+PostContinuationState = tuple[str, str]
+
+# (attribute_name, attribute_value, substitution, line_number_range_start)
+PostStageState = tuple[Optional[str], Optional[str], Optional[str], Optional[int]]
+
+# (class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start)
+PostFlushState = tuple[
+    Optional[str], Optional['Replacement'], Optional[str], Optional[str], Optional[str], Optional[int]
+]
+
+# (class_name, replacement, attribute_name, attribute_value, substitution, line_number_range_start)
+PostCommitState = tuple[
+    Optional[str], Optional['Replacement'], Optional[str], Optional[str], Optional[str], Optional[int]
+]
+
+
+# (line_number, line_type, line_match)
+ClassifiedRulesLine = tuple[int, str, Optional[re.Match]]
+
+
+def classify_rules_lines(replacement_rules: str) -> Iterator[ClassifiedRulesLine]:
+    """
+    Lazily classify the lines of replacement rules.
+
+    The line type is one of `BLANK`, `COMMENT`, `RULES_INCLUSION`, `CLASS_DECLARATION`, `ATTRIBUTE_DECLARATION`,
+    `SUBSTITUTION_DECLARATION`, `CONTINUATION`, or `INVALID`,
+    and the line match is that of the corresponding line pattern (or None for the line types without one).
+    """
+    for line_number, line in enumerate(replacement_rules.splitlines(), start=1):
+        first_character = line[:1]  # empty for an empty line
+
+        if first_character in string.whitespace and ReplacementAuthority.is_whitespace_only(line):
+            yield line_number, 'BLANK', None
+            continue
+
+        if first_character == '#':
+            yield line_number, 'COMMENT', None
+            continue
+
+        # Only one of the line patterns can match a given first character, so only that one is tried
+        if first_character == '<':
+            line_type = 'RULES_INCLUSION'
+            line_match = compute_rules_inclusion_match(line)
+        elif first_character in string.ascii_letters:
+            line_type = 'CLASS_DECLARATION'
+            line_match = compute_class_declaration_match(line)
+        elif first_character == '-':
+            line_type = 'ATTRIBUTE_DECLARATION'
+            line_match = compute_attribute_declaration_match(line)
+        elif first_character == '*':
+            line_type = 'SUBSTITUTION_DECLARATION'
+            line_match = compute_substitution_declaration_match(line)
+        elif first_character in string.whitespace:
+            line_type = 'CONTINUATION'
+            line_match = compute_continuation_match(line)
+        else:
+            line_match = None
+
+        if line_match is None:
+            line_type = 'INVALID'
+
+        yield line_number, line_type, line_match
+
+
+RULES_INCLUSION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [<][ ]
+            (?:
+                [/] (?P<included_file_name> [\S][\s\S]*? )
+                    |
+                (?P<included_file_name_relative> [\S][\s\S]*? )
+            )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_rules_inclusion_match(line: str) -> Optional[re.Match]:
+    return RULES_INCLUSION_PATTERN_COMPILED.fullmatch(line)
+
+
+CLASS_DECLARATION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<class_name> [A-Za-z]+ ) [:]
+        [\s]+
+        [#] (?P<id_> [a-z0-9-.]+ )
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_class_declaration_match(line: str) -> Optional[re.Match]:
+    return CLASS_DECLARATION_PATTERN_COMPILED.fullmatch(line)
+
+
+ATTRIBUTE_DECLARATION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [-][ ] (?P<attribute_name> [a-z_]+ ) [:]
+        (?P<partial_attribute_value> [\s\S]* )
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_attribute_declaration_match(line: str) -> Optional[re.Match]:
+    return ATTRIBUTE_DECLARATION_PATTERN_COMPILED.fullmatch(line)
+
+
+SUBSTITUTION_DECLARATION_PATTERN_COMPILED = re.compile(
+    pattern=r'[*][ ] (?P<partial_substitution> [\s\S]* )',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_substitution_declaration_match(line: str) -> Optional[re.Match]:
+    return SUBSTITUTION_DECLARATION_PATTERN_COMPILED.fullmatch(line)
+
+
+CONTINUATION_PATTERN_COMPILED = re.compile(
+    pattern=r'(?P<continuation> [\s]+ [\S][\s\S]* )',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_continuation_match(line: str) -> Optional[re.Match]:
+    return CONTINUATION_PATTERN_COMPILED.fullmatch(line)
+
+
+ALLOWED_FLAG_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<whitespace_only> \A [\s]* \Z )
+            |
+        (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
+            |
+        [\s]*
+        (?:
+            (?P<flag_letter> [a-z] ) = (?P<flag_name> [A-Z_]+ ) (?= [\s] | \Z )
+                |
+            (?P<invalid_syntax> [\S]+ )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_allowed_flag_matches(attribute_value: str) -> Iterable[re.Match]:
+    return ALLOWED_FLAG_PATTERN_COMPILED.finditer(attribute_value)
+
+
+APPLY_MODE_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<apply_mode> SIMULTANEOUS | SEQUENTIAL )
+                |
+            (?P<invalid_value> [\s\S]*? )
+            )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_apply_mode_match(attribute_value: str) -> Optional[re.Match]:
+    return APPLY_MODE_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+ATTRIBUTE_SPECIFICATIONS_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<empty_keyword> EMPTY )
+                |
+            (?P<attribute_specifications> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_attribute_specifications_match(attribute_value: str) -> Optional[re.Match]:
+    return ATTRIBUTE_SPECIFICATIONS_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+CLOSING_DELIMITER_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<closing_delimiter> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_closing_delimiter_match(attribute_value: str) -> Optional[re.Match]:
+    return CLOSING_DELIMITER_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+CONCLUDING_REPLACEMENT_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<whitespace_only> \A [\s]* \Z )
+            |
+        (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
+            |
+        (?:
+            [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
+                |
+            (?P<invalid_syntax> [\S]+ )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
 
 
-class PostAttributeDeclarationState(NamedTuple):
-    attribute_name: str
-    attribute_value: str
-    line_number_range_start: int
+def compute_concluding_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
+    return CONCLUDING_REPLACEMENT_PATTERN_COMPILED.finditer(attribute_value)
 
 
-class PostSubstitutionDeclarationState(NamedTuple):
-    substitution: str
-    line_number_range_start: int
+CONTENT_REPLACEMENT_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<whitespace_only> \A [\s]* \Z )
+            |
+        (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
+            |
+        (?:
+            [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
+                |
+            (?P<invalid_syntax> [\S]+ )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_content_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
+    return CONTENT_REPLACEMENT_PATTERN_COMPILED.finditer(attribute_value)
+
+
+DELIMITER_CONVERSION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<whitespace_only> \A [\s]* \Z )
+            |
+        [\s]*
+        (?:
+            (?P<delimiter>
+            (?P<delimiter_character> [\S] ) (?P=delimiter_character)?
+        )
+            = (?P<tag_name> [a-z0-9]+ ) (?= [\s] | \Z )
+            |
+        (?P<invalid_syntax> [\S]+ )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
 
 
-class PostContinuationState(NamedTuple):
-    attribute_value: str
-    substitution: str
+def compute_delimiter_conversion_matches(attribute_value: str) -> Iterable[re.Match]:
+    return DELIMITER_CONVERSION_PATTERN_COMPILED.finditer(attribute_value)
 
 
-class PostStageState(NamedTuple):
-    attribute_name: Optional[str]
-    attribute_value: Optional[str]
-    substitution: Optional[str]
-    line_number_range_start: Optional[int]
+ENDING_PATTERN_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<ending_pattern> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
 
 
-class PostCommitState(NamedTuple):
-    class_name: Optional[str]
-    replacement: Optional['Replacement']
-    attribute_name: Optional[str]
-    attribute_value: Optional[str]
-    substitution: Optional[str]
-    line_number_range_start: Optional[int]
+def compute_ending_pattern_match(attribute_value: str) -> Optional[re.Match]:
+    return ENDING_PATTERN_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+EPILOGUE_DELIMITER_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<epilogue_delimiter> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_epilogue_delimiter_match(attribute_value: str) -> Optional[re.Match]:
+    return EPILOGUE_DELIMITER_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+OPENING_DELIMITER_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<opening_delimiter> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_opening_delimiter_match(attribute_value: str) -> Optional[re.Match]:
+    return OPENING_DELIMITER_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+PROHIBITED_CONTENT_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<prohibited_content> BLOCKS | ANCHORED_BLOCKS )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_prohibited_content_match(attribute_value: str) -> Optional[re.Match]:
+    return PROHIBITED_CONTENT_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+PROLOGUE_DELIMITER_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<prologue_delimiter> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_prologue_delimiter_match(attribute_value: str) -> Optional[re.Match]:
+    return PROLOGUE_DELIMITER_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+QUEUE_POSITION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<none_keyword> NONE )
+                |
+            (?P<root_keyword> ROOT )
+                |
+            (?P<queue_position_type> BEFORE | AFTER )
+            [ ]
+            [#] (?P<queue_reference_id> [a-z-.]+ )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_queue_position_match(attribute_value: str) -> Optional[re.Match]:
+    return QUEUE_POSITION_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+REPLACEMENT_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        (?P<whitespace_only> \A [\s]* \Z )
+            |
+        (?P<none_keyword> \A [\s]* NONE [\s]* \Z )
+            |
+        (?:
+            [#] (?P<id_> [a-z0-9-.]+ ) (?= [\s] | \Z )
+                |
+            (?P<invalid_syntax> [\S]+ )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_replacement_matches(attribute_value: str) -> Iterable[re.Match]:
+    return REPLACEMENT_PATTERN_COMPILED.finditer(attribute_value)
+
+
+STARTING_PATTERN_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<starting_pattern> [\S][\s\S]*? )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_starting_pattern_match(attribute_value: str) -> Optional[re.Match]:
+    return STARTING_PATTERN_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+SYNTAX_TYPE_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<syntax_type> BLOCK | INLINE )
+                |
+            (?P<invalid_value> [\s\S]*? )
+        )
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_syntax_type_match(attribute_value: str) -> Optional[re.Match]:
+    return SYNTAX_TYPE_PATTERN_COMPILED.fullmatch(attribute_value)
+
+
+SUBSTITUTION_DELIMITER_PATTERN_COMPILED = re.compile(pattern='[-]{2,}[>]')
+
+
+@functools.cache
+def compile_substitution_pattern(substitution_delimiter: str) -> re.Pattern:
+    return re.compile(
+        pattern=fr'''
+            [\s]*
+                (?:
+                    "(?P<double_quoted_pattern> [\s\S]*? )"
+                        |
+                    '(?P<single_quoted_pattern> [\s\S]*? )'
+                        |
+                    (?P<bare_pattern> [\s\S]*? )
+                )
+            [\s]*
+                {re.escape(substitution_delimiter)}
+                [\s]*
+                (?:
+                    "(?P<double_quoted_substitute> [\s\S]*? )"
+                        |
+                    '(?P<single_quoted_substitute> [\s\S]*? )'
+                        |
+                    (?P<bare_substitute> [\s\S]*? )
+                )
+            [\s]*
+        ''',
+        flags=re.ASCII | re.VERBOSE,
+    )
+
+
+def compute_substitution_match(substitution: str) -> Optional[re.Match]:
+    substitution_delimiters: list[str] = SUBSTITUTION_DELIMITER_PATTERN_COMPILED.findall(substitution)
+    if len(substitution_delimiters) == 0:
+        return None
+
+    longest_substitution_delimiter = max(substitution_delimiters, key=len)
+    return compile_substitution_pattern(longest_substitution_delimiter).fullmatch(substitution)
 
 
 def escape_regex_substitute(substitute: str) -> str:
@@ -1545,13 +1640,19 @@ def escape_regex_substitute(substitute: str) -> str:
 
 
 def extract_basename(name: str) -> str:
-    return re.sub(pattern=r'\A .* [/]', repl='', string=name, flags=re.VERBOSE)
+    # Strip everything up to the last slash, not looking past a newline
+    first_line_end = name.find('\n')
+    if first_line_end < 0:
+        first_line_end = len(name)
+
+    return name[name.rfind('/', 0, first_line_end) + 1:]
 
 
 def make_clean_url(cmd_name: str) -> str:
-    return re.sub(
-        pattern=r'(?P<last_separator> \A | [/] ) index \Z',
-        repl=r'\g<last_separator>',
-        string=cmd_name,
-        flags=re.VERBOSE,
-    )
+    if cmd_name == 'index':
+        return ''
+
+    if cmd_name.endswith('/index'):
+        return cmd_name.removesuffix('index')
+
+    return cmd_name
@@ -4,18 +4,47 @@
 Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
 
 Base classes for CMD replacement rules.
+
+Each class declares `__slots__` for the attributes it owns, including the `ReplacementWith*` mixins.
+Since multiple bases with non-empty slots have conflicting layouts, the mixin slots are laid out
+in the classes using the mixins instead (see `ReplacementMeta`).
 """
 
 import abc
-import copy
 import re
-from typing import Optional
+import sys
+import types
+from typing import Mapping, Optional, Sequence
 
 from conwaymd.constants import VERBOSE_MODE_DIVIDER_SYMBOL_COUNT
 from conwaymd.exceptions import CommittedMutateException, UncommittedApplyException
 
 
-class Replacement(abc.ABC):
+class ReplacementMeta(abc.ABCMeta):
+    """
+    Metaclass for replacement rules, laying out the slots of mixins in the classes using them.
+
+    A mixin (declared with `mixin=True`) keeps its `__slots__` as `_mixin_slots`, and itself declares no slots.
+    A class declaring `__slots__` gets the mixin slots of its bases added, unless already laid out by a base.
+    """
+    def __new__(mcs, name: str, bases: tuple[type, ...], namespace: dict, mixin: bool = False, **kwargs):
+        if mixin:
+            namespace['_mixin_slots'] = namespace.get('__slots__', ())
+            namespace['__slots__'] = ()
+        elif '__slots__' in namespace:
+            base_classes = [base_class for base in bases for base_class in base.__mro__]
+            laid_out_slots = {slot for base_class in base_classes for slot in vars(base_class).get('__slots__', ())}
+            mixin_slots = [slot for base_class in base_classes for slot in vars(base_class).get('_mixin_slots', ())]
+            namespace['__slots__'] = tuple(
+                slot
+                for slot in dict.fromkeys([*mixin_slots, *namespace['__slots__']])
+                if slot not in laid_out_slots
+            )
+
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class Replacement(metaclass=ReplacementMeta):
     """
     Base class for a replacement rule.
 
@@ -28,12 +57,27 @@ class Replacement(abc.ABC):
     - negative_flag: (def) NONE | «FLAG_NAME»
     ````
     """
+    __slots__ = (
+        '_is_committed',
+        '_id',
+        '_queue_position_type',
+        '_queue_reference_replacement',
+        '_positive_flag_name',
+        '_negative_flag_name',
+        '_positive_flag_bit',
+        '_negative_flag_bit',
+        '_is_flag_gated',
+        '_verbose_mode_enabled',
+    )
     _is_committed: bool
     _id: str
     _queue_position_type: Optional[str]
     _queue_reference_replacement: Optional['Replacement']
     _positive_flag_name: Optional[str]
     _negative_flag_name: Optional[str]
+    _positive_flag_bit: int
+    _negative_flag_bit: int
+    _is_flag_gated: bool
     _verbose_mode_enabled: bool
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -43,6 +87,9 @@ class Replacement(abc.ABC):
         self._queue_reference_replacement = None
         self._positive_flag_name = None
         self._negative_flag_name = None
+        self._positive_flag_bit = 0
+        self._negative_flag_bit = 0
+        self._is_flag_gated = False
         self._verbose_mode_enabled = verbose_mode_enabled
 
     @property
@@ -63,6 +110,9 @@ class Replacement(abc.ABC):
         if self._is_committed:
             raise CommittedMutateException('error: cannot set `queue_position_type` after `commit()`')
 
+        if value is not None:
+            value = sys.intern(value)  # so that comparisons against the literal types are identity checks
+
         self._queue_position_type = value
 
     @property
@@ -98,53 +148,72 @@ class Replacement(abc.ABC):
 
         self._negative_flag_name = value
 
-    def commit(self):
+    def commit(self, flag_bit_from_name: dict[str, int]):
         self._validate_mandatory_attributes()
         self._set_apply_method_variables()
+        self._positive_flag_bit = Replacement.get_flag_bit(flag_bit_from_name, self._positive_flag_name)
+        self._negative_flag_bit = Replacement.get_flag_bit(flag_bit_from_name, self._negative_flag_name)
+        self._is_flag_gated = self._positive_flag_name is not None or self._negative_flag_name is not None
         self._is_committed = True
 
-    def apply(self, string: str, enabled_flag_names: Optional[set[str]] = None) -> str:
+    @staticmethod
+    def get_flag_bit(flag_bit_from_name: dict[str, int], flag_name: Optional[str]) -> int:
+        """
+        Get the bit representing a flag name in a set of enabled flags, or 0 if there is no flag name.
+
+        Bits are assigned on first use in `flag_bit_from_name`,
+        which is shared by the replacements of one replacement authority (see `ReplacementAuthority.commit`).
+        """
+        if flag_name is None:
+            return 0
+
+        try:
+            return flag_bit_from_name[flag_name]
+        except KeyError:
+            flag_bit = flag_bit_from_name[flag_name] = 1 << len(flag_bit_from_name)
+            return flag_bit
+
+    def apply(self, string: str, enabled_flag_bits: Optional[int] = None) -> str:
         if not self._is_committed:
             raise UncommittedApplyException('error: cannot call `apply(string)` before `commit()`')
 
-        if enabled_flag_names is not None:
-            positive_flag_name = self._positive_flag_name
-            if positive_flag_name is not None and positive_flag_name not in enabled_flag_names:
+        if self._is_flag_gated and enabled_flag_bits is not None:
+            if self._positive_flag_bit & ~enabled_flag_bits:  # positive flag not enabled
                 return string
 
-            negative_flag_name = self._negative_flag_name
-            if negative_flag_name is not None and negative_flag_name in enabled_flag_names:
+            if self._negative_flag_bit & enabled_flag_bits:  # negative flag enabled
                 return string
 
-        string_before = string
-        string = self._apply(string)
-        string_after = string
+        string_after = self._apply(string)
 
         if self._verbose_mode_enabled:
-            if string_before == string_after:
-                no_change_indicator = ' (no change)'
-            else:
-                no_change_indicator = ''
-
-            try:
-                print('<' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + f' BEFORE #{self._id}')
-                print(string_before)
-                print('=' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + no_change_indicator)
-                print(string_after)
-                print('>' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + f' AFTER #{self._id}')
-                print('\n\n\n\n')
-            except UnicodeEncodeError as unicode_encode_error:
-                # caused by Private Use Area code points used for placeholders
-                error_message = (
-                    'bad print due to non-Unicode terminal encoding, likely `cp1252` on Git BASH for Windows. '
-                    'Try setting the `PYTHONIOENCODING` environment variable to `utf-8` '
-                    '(add `export PYTHONIOENCODING=utf-8` to `.bash_profile` and then source it). '
-                    'See <https://stackoverflow.com/a/7865013>.'
-                )
-                raise FileNotFoundError(error_message) from unicode_encode_error
+            self._print_verbose_output(string, string_after)
 
         return string_after
 
+    def _print_verbose_output(self, string_before: str, string_after: str):
+        if string_before == string_after:
+            no_change_indicator = ' (no change)'
+        else:
+            no_change_indicator = ''
+
+        try:
+            print('<' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + f' BEFORE #{self._id}')
+            print(string_before)
+            print('=' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + no_change_indicator)
+            print(string_after)
+            print('>' * VERBOSE_MODE_DIVIDER_SYMBOL_COUNT + f' AFTER #{self._id}')
+            print('\n\n\n\n')
+        except UnicodeEncodeError as unicode_encode_error:
+            # caused by Private Use Area code points used for placeholders
+            error_message = (
+                'bad print due to non-Unicode terminal encoding, likely `cp1252` on Git BASH for Windows. '
+                'Try setting the `PYTHONIOENCODING` environment variable to `utf-8` '
+                '(add `export PYTHONIOENCODING=utf-8` to `.bash_profile` and then source it). '
+                'See <https://stackoverflow.com/a/7865013>.'
+            )
+            raise FileNotFoundError(error_message) from unicode_encode_error
+
     @abc.abstractmethod
     def _validate_mandatory_attributes(self):
         """
@@ -167,7 +236,7 @@ class Replacement(abc.ABC):
         raise NotImplementedError
 
 
-class ReplacementWithSubstitutions(Replacement, abc.ABC):
+class ReplacementWithSubstitutions(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with substitutions.
 
@@ -181,6 +250,7 @@ class ReplacementWithSubstitutions(Replacement, abc.ABC):
     [...]
     ````
     """
+    __slots__ = ('_substitute_from_pattern',)
     _substitute_from_pattern: dict[str, str]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -193,7 +263,7 @@ class ReplacementWithSubstitutions(Replacement, abc.ABC):
         self._substitute_from_pattern[pattern] = substitute
 
 
-class ReplacementWithSyntaxType(Replacement, abc.ABC):
+class ReplacementWithSyntaxType(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `syntax_type`.
 
@@ -204,6 +274,7 @@ class ReplacementWithSyntaxType(Replacement, abc.ABC):
     - syntax_type: BLOCK | INLINE (mandatory)
     ````
     """
+    __slots__ = ('_syntax_type_is_block',)
     _syntax_type_is_block: Optional[bool]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -222,7 +293,7 @@ class ReplacementWithSyntaxType(Replacement, abc.ABC):
         self._syntax_type_is_block = value
 
 
-class ReplacementWithAllowedFlags(Replacement, abc.ABC):
+class ReplacementWithAllowedFlags(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `allowed_flags`.
 
@@ -233,16 +304,31 @@ class ReplacementWithAllowedFlags(Replacement, abc.ABC):
     - allowed_flags: (def) NONE | «letter»=«FLAG_NAME» [...]
     ````
     """
-    _flag_name_from_letter: dict[str, str]
+    __slots__ = (
+        '_flag_name_from_letter',
+        '_flag_bit_from_letter',
+        '_has_flags',
+    )
+    _flag_name_from_letter: Mapping[str, str]
+    _flag_bit_from_letter: Mapping[str, int]
     _has_flags: bool
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._flag_name_from_letter = {}
+        self._flag_bit_from_letter = {}
         self._has_flags = False
 
+    def commit(self, flag_bit_from_name: dict[str, int]):
+        self._flag_name_from_letter = types.MappingProxyType(self._flag_name_from_letter)
+        self._flag_bit_from_letter = ReplacementWithAllowedFlags.compute_flag_bit_from_letter(
+            self._flag_name_from_letter,
+            flag_bit_from_name,
+        )
+        super().commit(flag_bit_from_name)
+
     @property
-    def flag_name_from_letter(self) -> dict[str, str]:
+    def flag_name_from_letter(self) -> Mapping[str, str]:
         return self._flag_name_from_letter
 
     @flag_name_from_letter.setter
@@ -250,21 +336,31 @@ class ReplacementWithAllowedFlags(Replacement, abc.ABC):
         if self._is_committed:
             raise CommittedMutateException('error: cannot set `flag_name_from_letter` after `commit()`')
 
-        self._flag_name_from_letter = copy.copy(value)
+        self._flag_name_from_letter = value
 
     @staticmethod
-    def get_enabled_flag_names(match: re.Match, flag_name_from_letter: dict[str, str], has_flags: bool) -> set[str]:
-        enabled_flag_names: set[str] = set()
-        if has_flags:
-            flags = match.group('flags')
-            for flag_letter, flag_name in flag_name_from_letter.items():
-                if flag_letter in flags:
-                    enabled_flag_names.add(flag_name)
+    def compute_flag_bit_from_letter(flag_name_from_letter: Mapping[str, str],
+                                     flag_bit_from_name: dict[str, int]) -> dict[str, int]:
+        return {
+            flag_letter: Replacement.get_flag_bit(flag_bit_from_name, flag_name)
+            for flag_letter, flag_name in flag_name_from_letter.items()
+        }
 
-        return enabled_flag_names
+    @staticmethod
+    def get_enabled_flag_bits(match: re.Match, flag_bit_from_letter: Mapping[str, int]) -> int:
+        """
+        Get the bits of the flags enabled in a match, which must have a `flags` group (i.e. `has_flags` is true).
+        """
+        enabled_flag_bits = 0
+        flags = match.group('flags')
+        for flag_letter, flag_bit in flag_bit_from_letter.items():
+            if flag_letter in flags:
+                enabled_flag_bits |= flag_bit
+
+        return enabled_flag_bits
 
 
-class ReplacementWithAttributeSpecifications(Replacement, abc.ABC):
+class ReplacementWithAttributeSpecifications(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `attribute_specifications`.
 
@@ -275,6 +371,7 @@ class ReplacementWithAttributeSpecifications(Replacement, abc.ABC):
     - attribute_specifications: (def) NONE | EMPTY | «string»
     ````
     """
+    __slots__ = ('_attribute_specifications',)
     _attribute_specifications: Optional[str]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -293,7 +390,7 @@ class ReplacementWithAttributeSpecifications(Replacement, abc.ABC):
         self._attribute_specifications = value
 
 
-class ReplacementWithProhibitedContent(Replacement, abc.ABC):
+class ReplacementWithProhibitedContent(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `prohibited_content`.
 
@@ -304,6 +401,7 @@ class ReplacementWithProhibitedContent(Replacement, abc.ABC):
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = ('_prohibited_content_regex',)
     _prohibited_content_regex: Optional[str]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -322,7 +420,7 @@ class ReplacementWithProhibitedContent(Replacement, abc.ABC):
         self._prohibited_content_regex = value
 
 
-class ReplacementWithContentReplacements(Replacement, abc.ABC):
+class ReplacementWithContentReplacements(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `content_replacements`.
 
@@ -333,14 +431,19 @@ class ReplacementWithContentReplacements(Replacement, abc.ABC):
     - content_replacements: (def) NONE | #«id» [...]
     ````
     """
-    _content_replacements: list['Replacement']
+    __slots__ = ('_content_replacements',)
+    _content_replacements: Sequence['Replacement']
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._content_replacements = []
 
+    def commit(self, flag_bit_from_name: dict[str, int]):
+        self._content_replacements = tuple(self._content_replacements)
+        super().commit(flag_bit_from_name)
+
     @property
-    def content_replacements(self) -> list['Replacement']:
+    def content_replacements(self) -> Sequence['Replacement']:
         return self._content_replacements
 
     @content_replacements.setter
@@ -348,10 +451,10 @@ class ReplacementWithContentReplacements(Replacement, abc.ABC):
         if self._is_committed:
             raise CommittedMutateException('error: cannot set `content_replacements` after `commit()`')
 
-        self._content_replacements = copy.copy(value)
+        self._content_replacements = value
 
 
-class ReplacementWithTagName(Replacement, abc.ABC):
+class ReplacementWithTagName(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `tag_name`.
 
@@ -362,6 +465,7 @@ class ReplacementWithTagName(Replacement, abc.ABC):
     - tag_name: (def) NONE | «name»
     ````
     """
+    __slots__ = ('_tag_name',)
     _tag_name: Optional[str]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
@@ -380,7 +484,7 @@ class ReplacementWithTagName(Replacement, abc.ABC):
         self._tag_name = value
 
 
-class ReplacementWithConcludingReplacements(Replacement, abc.ABC):
+class ReplacementWithConcludingReplacements(Replacement, abc.ABC, mixin=True):
     """
     Base class for a replacement rule with `concluding_replacements`.
 
@@ -391,14 +495,19 @@ class ReplacementWithConcludingReplacements(Replacement, abc.ABC):
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
-    _concluding_replacements: list['Replacement']
+    __slots__ = ('_concluding_replacements',)
+    _concluding_replacements: Sequence['Replacement']
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._concluding_replacements = []
 
+    def commit(self, flag_bit_from_name: dict[str, int]):
+        self._concluding_replacements = tuple(self._concluding_replacements)
+        super().commit(flag_bit_from_name)
+
     @property
-    def concluding_replacements(self) -> list['Replacement']:
+    def concluding_replacements(self) -> Sequence['Replacement']:
         return self._concluding_replacements
 
     @concluding_replacements.setter
@@ -406,4 +515,4 @@ class ReplacementWithConcludingReplacements(Replacement, abc.ABC):
         if self._is_committed:
             raise CommittedMutateException('error: cannot set `concluding_replacements` after `commit()`')
 
-        self._concluding_replacements = copy.copy(value)
+        self._concluding_replacements = value
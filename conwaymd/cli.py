@@ -7,33 +7,78 @@ Command-line interface.
 """
 
 import argparse
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import io
+import itertools
 import os
-import re
+import pathlib
 import sys
+import traceback
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
 from conwaymd._version import __version__
-from conwaymd.constants import COMMAND_LINE_ERROR_EXIT_CODE, GENERIC_ERROR_EXIT_CODE
-from conwaymd.core import cmd_to_html
-
-DESCRIPTION = '''
-    Convert Conway-Markdown (CMD) to HTML.
-'''
-CMD_FILE_NAME_HELP = '''
-    name of CMD file to be converted
-    (can be abbreviated as `file` or `file.` for increased productivity)
-'''
-ALL_MODE_HELP = '''
-    convert all CMD files under the working directory
-'''
-VERBOSE_MODE_HELP = '''
-    run in verbose mode (prints every replacement applied)
-'''
+from conwaymd.authorities import ClassifiedRulesLine, classify_rules_lines
+from conwaymd.constants import (
+    COMMAND_LINE_ERROR_EXIT_CODE,
+    GENERIC_ERROR_EXIT_CODE,
+    HTML_CACHE_MAX_BYTE_COUNT,
+    PARALLEL_CONVERSION_MIN_FILE_COUNT,
+)
+from conwaymd.core import classified_rules_and_content_to_html, extract_rules_and_content
+
+DESCRIPTION = 'Convert Conway-Markdown (CMD) to HTML.'
+CMD_FILE_NAME_HELP = (
+    'name of CMD file to be converted '
+    '(can be abbreviated as `file` or `file.` for increased productivity)'
+)
+ALL_MODE_HELP = 'convert all CMD files under the working directory'
+VERBOSE_MODE_HELP = 'run in verbose mode (prints every replacement applied)'
+CACHE_MODE_HELP = (
+    'reuse the HTML of CMD files unchanged since a previous run in cache mode '
+    '(cached under `$XDG_CACHE_HOME/conwaymd`, or `~/.cache/conwaymd`, evicting the least recently used; '
+    'ignored in verbose mode)'
+)
+CURRENT_DIRECTORY_PREFIX = os.curdir + os.sep
 
 
 def is_cmd_file(file_name: str) -> bool:
     return file_name.endswith('.cmd')
 
 
+def walk_cmd_file_names(directory_name: str = os.curdir) -> Iterator[str]:
+    """
+    Lazily walk a directory (by default the working directory) for CMD file names, depth first.
+
+    Each directory is scanned only when the walk reaches it, and its entries are sorted by name,
+    with a directory name followed by the path separator (as it is in the paths beneath it).
+    Hence CMD file names are yielded in the same order as sorting all of their paths,
+    while only the sorted entries of the directories along the current path are held in memory.
+    Uses `os.scandir` directly (rather than `os.walk`) so that entries are told apart without further `stat` calls.
+    As with `os.walk`, symbolic links to directories are not followed, and unreadable directories are skipped.
+    """
+    try:
+        with os.scandir(directory_name) as directory_entries:
+            sort_keys_and_paths = []
+            for directory_entry in directory_entries:
+                if directory_entry.is_dir():
+                    if not directory_entry.is_symlink():
+                        sort_keys_and_paths.append((directory_entry.name + os.sep, directory_entry.path))
+                elif is_cmd_file(directory_entry.name):
+                    sort_keys_and_paths.append((directory_entry.name, directory_entry.path))
+    except OSError:
+        return
+
+    for sort_key, path in sorted(sort_keys_and_paths):  # sort keys are unique within a directory
+        if sort_key.endswith(os.sep):
+            yield from walk_cmd_file_names(path)
+        else:
+            yield path
+
+
 def extract_cmd_name(cmd_file_name_argument: str) -> str:
     """
     Extract name-without-extension from a CMD file name argument.
@@ -42,12 +87,31 @@ def extract_cmd_name(cmd_file_name_argument: str) -> str:
     The path is normalised by resolving `./` and `../`.
     """
     cmd_file_name_argument = os.path.normpath(cmd_file_name_argument)
-    cmd_name = re.sub(pattern=r'[.](cmd)? \Z', repl='', string=cmd_file_name_argument, flags=re.VERBOSE)
+    if cmd_file_name_argument.endswith('.cmd'):
+        cmd_name = cmd_file_name_argument.removesuffix('.cmd')
+    else:
+        cmd_name = cmd_file_name_argument.removesuffix('.')
 
     return cmd_name
 
 
-def parse_command_line_arguments() -> argparse.Namespace:
+def extract_walked_cmd_name(walked_cmd_file_name: str) -> str:
+    """
+    Extract name-without-extension from a CMD file name found by walking the working directory.
+
+    Here, walked CMD file name is of the form `./«cmd_name».cmd`.
+    Apart from the leading `./`, the path is already normalised, so `os.path.normpath` is not needed.
+    """
+    cmd_name = walked_cmd_file_name.removeprefix(CURRENT_DIRECTORY_PREFIX).removesuffix('.cmd')
+
+    return cmd_name
+
+
+@functools.cache
+def build_argument_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser, once per process.
+    """
     argument_parser = argparse.ArgumentParser(description=DESCRIPTION)
     argument_parser.add_argument(
         '-v', '--version',
@@ -66,6 +130,12 @@ def parse_command_line_arguments() -> argparse.Namespace:
         action='store_true',
         help=VERBOSE_MODE_HELP,
     )
+    argument_parser.add_argument(
+        '-c', '--cache',
+        dest='cache_mode_enabled',
+        action='store_true',
+        help=CACHE_MODE_HELP,
+    )
     argument_parser.add_argument(
         'cmd_file_name_arguments',
         default=[],
@@ -74,15 +144,136 @@ def parse_command_line_arguments() -> argparse.Namespace:
         nargs='*',
     )
 
-    return argument_parser.parse_args()
+    return argument_parser
+
+
+def parse_command_line_arguments() -> argparse.Namespace:
+    return build_argument_parser().parse_args()
+
+
+def compute_cache_directory_name() -> str:
+    cache_home_directory_name = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home_directory_name, 'conwaymd')
+
+
+@functools.cache
+def compute_conversion_hash() -> hashlib.blake2b:
+    """
+    Compute the hash of everything other than the CMD file that its HTML depends on, once per process.
+
+    Besides the version, this covers the source of every module of the package (including the standard rules),
+    so that changes to the conversion code invalidate the cache even without a version bump (e.g. editable installs).
+    """
+    conversion_hash = hashlib.blake2b(digest_size=16)
+    conversion_hash.update(__version__.encode('utf-8'))
+    conversion_hash.update(b'\0')
+
+    for module_file_path in sorted(pathlib.Path(__file__).parent.glob('*.py')):
+        conversion_hash.update(module_file_path.name.encode('utf-8'))
+        conversion_hash.update(b'\0')
+        conversion_hash.update(module_file_path.read_bytes())
+        conversion_hash.update(b'\0')
+
+    return conversion_hash
+
+
+def compute_cache_file_name(classified_rules_lines: Sequence[ClassifiedRulesLine], cmd_bytes: bytes,
+                            cmd_file_name: str) -> Optional[str]:
+    """
+    Compute the name of the cache file for the HTML of a CMD file.
+
+    The HTML depends only on the CMD file content and name (given the version and package sources),
+    unless the replacement rules include other files, in which case the HTML is not cached (and None is returned).
+    The replacement rules are taken already classified, so that they are classified once (for lookup and conversion).
+    """
+    if any(line_type == 'RULES_INCLUSION' for _, line_type, _ in classified_rules_lines):
+        return None
+
+    cache_hash = compute_conversion_hash().copy()
+    cache_hash.update(cmd_file_name.encode('utf-8'))
+    cache_hash.update(b'\0')
+    cache_hash.update(cmd_bytes)
+
+    return os.path.join(compute_cache_directory_name(), f'{cache_hash.hexdigest()}.html')
+
+
+def read_cached_html(cache_file_name: Optional[str]) -> Optional[bytes]:
+    if cache_file_name is None:
+        return None
+
+    try:
+        html_bytes = pathlib.Path(cache_file_name).read_bytes()
+        os.utime(cache_file_name)  # mark as recently used, see `prune_html_cache`
+    except OSError:
+        return None
+
+    return html_bytes
+
+
+def write_cached_html(cache_file_name: Optional[str], html_bytes: bytes):
+    """
+    Write HTML to the cache, atomically so that concurrent conversions never read a partially written file.
+
+    Failure to write to the cache is not an error, since the cache is only an optimisation.
+    """
+    if cache_file_name is None:
+        return
+
+    temporary_cache_file_name = f'{cache_file_name}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_file_name), exist_ok=True)
+        pathlib.Path(temporary_cache_file_name).write_bytes(html_bytes)
+        os.replace(temporary_cache_file_name, cache_file_name)
+    except OSError:
+        pass
+
+
+def prune_html_cache(cache_directory_name: Optional[str] = None, max_byte_count: int = HTML_CACHE_MAX_BYTE_COUNT):
+    """
+    Evict the least recently used HTML from the cache until it takes up at most `max_byte_count` bytes.
+
+    Like writing to the cache, failure to prune it is not an error.
+    """
+    if cache_directory_name is None:
+        cache_directory_name = compute_cache_directory_name()
+
+    cache_files = []
+    try:
+        with os.scandir(cache_directory_name) as directory_entries:
+            for directory_entry in directory_entries:
+                if directory_entry.is_file(follow_symlinks=False):
+                    file_stat = directory_entry.stat(follow_symlinks=False)
+                    cache_files.append((file_stat.st_mtime, file_stat.st_size, directory_entry.path))
+    except OSError:
+        return
+
+    byte_count = sum(size for _, size, _ in cache_files)
+    if byte_count <= max_byte_count:
+        return
 
+    for _, size, cache_file_name in sorted(cache_files):
+        try:
+            os.remove(cache_file_name)
+        except OSError:
+            continue
 
-def generate_html_file(cmd_file_name_argument: str, verbose_mode_enabled: bool, uses_command_line_argument: bool):
-    cmd_name = extract_cmd_name(cmd_file_name_argument)
+        byte_count -= size
+        if byte_count <= max_byte_count:
+            break
+
+
+def convert_cmd_file(cmd_file_name_argument: str, verbose_mode_enabled: bool, uses_command_line_argument: bool,
+                     cache_mode_enabled: bool = False) -> tuple[str, bytes]:
+    """
+    Convert a CMD file, returning the name of its HTML file and the HTML bytes to be written there.
+    """
+    if uses_command_line_argument:
+        cmd_name = extract_cmd_name(cmd_file_name_argument)
+    else:
+        cmd_name = extract_walked_cmd_name(cmd_file_name_argument)
     cmd_file_name = f'{cmd_name}.cmd'
     try:
-        with open(cmd_file_name, 'r', encoding='utf-8') as cmd_file:
-            cmd = cmd_file.read()
+        cmd_bytes = pathlib.Path(cmd_file_name).read_bytes()
     except FileNotFoundError as file_not_found_error:
         if uses_command_line_argument:
             print(f'error: argument `{cmd_file_name_argument}`: file `{cmd_file_name}` not found', file=sys.stderr)
@@ -91,41 +282,157 @@ def generate_html_file(cmd_file_name_argument: str, verbose_mode_enabled: bool,
             error_message = f'file `{cmd_file_name}` not found for `{cmd_file_name}` in cmd_file_name_list'
             raise FileNotFoundError(error_message) from file_not_found_error
 
-    html = cmd_to_html(cmd, cmd_file_name, verbose_mode_enabled)
+    if b'\r' in cmd_bytes:  # translate newlines as text mode would have (safe on bytes since UTF-8)
+        cmd_bytes = cmd_bytes.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+    # Find the delimiter on the bytes, so that the CMD is decoded in its two parts without a further copy
+    replacement_rules_bytes, main_content_bytes = extract_rules_and_content(cmd_bytes)
+    replacement_rules = replacement_rules_bytes.decode('utf-8')
+    main_content = main_content_bytes.decode('utf-8')
+
+    if cache_mode_enabled and not verbose_mode_enabled:
+        classified_rules_lines = tuple(classify_rules_lines(replacement_rules))  # also needed for the cache lookup
+        cache_file_name = compute_cache_file_name(classified_rules_lines, cmd_bytes, cmd_file_name)
+    else:
+        classified_rules_lines = classify_rules_lines(replacement_rules)
+        cache_file_name = None
+
+    html_bytes = read_cached_html(cache_file_name)
+    if html_bytes is None:
+        html = classified_rules_and_content_to_html(classified_rules_lines, main_content, cmd_file_name,
+                                                    verbose_mode_enabled)
+
+        if os.linesep != '\n':  # translate newlines as text mode would have
+            html = html.replace('\n', os.linesep)
+
+        html_bytes = html.encode('utf-8')
+        write_cached_html(cache_file_name, html_bytes)
 
     html_file_name = f'{cmd_name}.html'
+
+    return html_file_name, html_bytes
+
+
+def write_html_file(html_file_name: str, html_bytes: bytes):
     try:
-        with open(html_file_name, 'w', encoding='utf-8') as html_file:
-            html_file.write(html)
+        pathlib.Path(html_file_name).write_bytes(html_bytes)
         print(f'success: wrote to `{html_file_name}`')
     except IOError:
         print(f'error: cannot write to `{html_file_name}`', file=sys.stderr)
         sys.exit(GENERIC_ERROR_EXIT_CODE)
 
 
+def generate_html_file(cmd_file_name_argument: str, verbose_mode_enabled: bool, uses_command_line_argument: bool,
+                       cache_mode_enabled: bool = False):
+    html_file_name, html_bytes = convert_cmd_file(cmd_file_name_argument, verbose_mode_enabled,
+                                                  uses_command_line_argument, cache_mode_enabled)
+    write_html_file(html_file_name, html_bytes)
+
+
+def convert_walked_cmd_file_in_worker(walked_cmd_file_name: str, cache_mode_enabled: bool,
+                                      ) -> tuple[Optional[tuple[str, bytes]], str, Optional[int]]:
+    """
+    Convert a walked CMD file in a worker process, capturing its error output rather than printing it.
+
+    Returns the converted (HTML file name, HTML bytes) (None if the conversion failed), the captured error output,
+    and the exit code (None if the conversion did not fail),
+    so that the main process can report conversions in sorted order and stop at the first failure.
+    An uncaught exception is reported by its traceback and the generic error exit code,
+    as the interpreter would have done had the conversion been sequential.
+    """
+    error_output = io.StringIO()
+    with contextlib.redirect_stderr(error_output):  # safe, since the worker is a process of its own
+        try:
+            converted = convert_cmd_file(walked_cmd_file_name, verbose_mode_enabled=False,
+                                         uses_command_line_argument=False, cache_mode_enabled=cache_mode_enabled)
+        except SystemExit as system_exit:
+            return None, error_output.getvalue(), system_exit.code
+        except Exception:
+            traceback.print_exc()
+            return None, error_output.getvalue(), GENERIC_ERROR_EXIT_CODE
+
+    return converted, error_output.getvalue(), None
+
+
+def map_lazily_in_order(executor: concurrent.futures.Executor, function: Callable, arguments: Iterable,
+                        buffer_size: int) -> Iterator:
+    """
+    Map a function over arguments in an executor, yielding results in the order of the arguments.
+
+    Unlike `executor.map`, which submits every argument up front (and so exhausts a lazy iterable before anything
+    is yielded), at most `buffer_size` arguments are submitted ahead of the result being yielded.
+    """
+    futures = collections.deque()
+
+    for argument in arguments:
+        futures.append(executor.submit(function, argument))
+        if len(futures) >= buffer_size:
+            yield futures.popleft().result()
+
+    while len(futures) > 0:
+        yield futures.popleft().result()
+
+
 def main():
     parsed_arguments = parse_command_line_arguments()
     cmd_file_name_arguments = parsed_arguments.cmd_file_name_arguments
     all_mode_enabled = parsed_arguments.all_mode_enabled
     verbose_mode_enabled = parsed_arguments.verbose_mode_enabled
+    cache_mode_enabled = parsed_arguments.cache_mode_enabled
+
+    # Bind the run-wide options once, rather than threading them through every call below
+    generate_html_file_for_run = functools.partial(
+        generate_html_file,
+        verbose_mode_enabled=verbose_mode_enabled,
+        cache_mode_enabled=cache_mode_enabled,
+    )
 
     if all_mode_enabled:
         if len(cmd_file_name_arguments) > 0:
             print('error: option -a (or --all) cannot be used with positional argument', file=sys.stderr)
             sys.exit(COMMAND_LINE_ERROR_EXIT_CODE)
 
-        cmd_file_names = [
-            os.path.join(path, file_name)
-            for path, _, file_names in os.walk(os.curdir)
-            for file_name in file_names
-            if is_cmd_file(file_name)
-        ]
-        for cmd_file_name in sorted(cmd_file_names):
-            generate_html_file(cmd_file_name, verbose_mode_enabled, uses_command_line_argument=False)
+        cmd_file_names = walk_cmd_file_names()
+
+        # Peek (lazily) at the start of the walk, since starting worker processes costs more than converting a few
+        # typical CMD files
+        leading_cmd_file_names = list(itertools.islice(cmd_file_names, PARALLEL_CONVERSION_MIN_FILE_COUNT))
+        cmd_file_names = itertools.chain(leading_cmd_file_names, cmd_file_names)
+        worker_count = os.cpu_count() or 1
+
+        # Convert sequentially when printed replacements must not interleave, or when a pool is not worth starting
+        if (
+            verbose_mode_enabled
+            or len(leading_cmd_file_names) < PARALLEL_CONVERSION_MIN_FILE_COUNT
+            or worker_count <= 1
+        ):
+            for cmd_file_name in cmd_file_names:
+                generate_html_file_for_run(cmd_file_name, uses_command_line_argument=False)
+        else:
+            # Each conversion legislates its own replacement rules, so conversions share no mutable state.
+            # They run in parallel, but are written and reported here in sorted order, stopping at the first failure.
+            convert_in_worker = functools.partial(convert_walked_cmd_file_in_worker,
+                                                  cache_mode_enabled=cache_mode_enabled)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+                try:
+                    for converted, error_output, exit_code in map_lazily_in_order(
+                        executor, convert_in_worker, cmd_file_names, buffer_size=2 * worker_count,
+                    ):
+                        sys.stderr.write(error_output)
+                        if converted is None:
+                            sys.exit(exit_code)
+
+                        write_html_file(*converted)
+                except BaseException:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
 
     else:
         for cmd_file_name_argument in cmd_file_name_arguments:
-            generate_html_file(cmd_file_name_argument, verbose_mode_enabled, uses_command_line_argument=True)
+            generate_html_file_for_run(cmd_file_name_argument, uses_command_line_argument=True)
+
+    if cache_mode_enabled and not verbose_mode_enabled:  # once per run, rather than once per cache write
+        prune_html_cache()
 
 
 if __name__ == '__main__':
@@ -9,6 +9,13 @@ Constants.
 GENERIC_ERROR_EXIT_CODE = 1
 COMMAND_LINE_ERROR_EXIT_CODE = 2
 VERBOSE_MODE_DIVIDER_SYMBOL_COUNT = 48
+SIMULTANEOUS_REGEX_CACHE_MAX_SIZE = 512
+COMPILED_REGEX_CACHE_MAX_SIZE = 1024
+REPLACE_CHAIN_MAX_PATTERN_COUNT = 8
+REGEX_PATTERN_CACHE_MAX_SIZE = 256
+ATTRIBUTES_SEQUENCE_CACHE_MAX_SIZE = 1024
+HTML_CACHE_MAX_BYTE_COUNT = 64 * 1024 * 1024
+PARALLEL_CONVERSION_MIN_FILE_COUNT = 32
 
 CMD_REPLACEMENT_SYNTAX_HELP = '''\
 In CMD replacement rule syntax, a line must be one of the following:
@@ -17,69 +17,103 @@ If the file is free of «delimiter», the whole file is parsed as «main_content
 For details on how «replacement_rules» and «main_content» are parsed, see <https://conwaymd.github.io/>.
 """
 
-import re
+import functools
+from typing import AnyStr, Iterable
 
-from conwaymd.authorities import ReplacementAuthority
+from conwaymd.authorities import ClassifiedRulesLine, ReplacementAuthority, classify_rules_lines
 from conwaymd.constants import STANDARD_RULES
 from conwaymd.utilities import none_to_empty_string
 
 
-def extract_rules_and_content(cmd: str) -> tuple[str, str]:
+def extract_rules_and_content(cmd: AnyStr) -> tuple[AnyStr, AnyStr]:
     """
     Extract replacement rules and main content from CMD file content.
 
     «delimiter» shall be 3-or-more percent signs on its own line.
     If the CMD file content is free of «delimiter»,
-    all of it shall be parsed as «main_content».
+    all of it shall be parsed as «main_content» (with empty «replacement_rules»).
     If the CMD file content contains «delimiter»,
     it shall be parsed as
             «replacement_rules»
             «delimiter»
             «main_content»
     according to the first occurrence of «delimiter».
+
+    CMD file content may also be given as UTF-8 bytes (see `generate_html_file` in `cli.py`),
+    so that «delimiter» can be found before any decoding.
     """
-    match = re.fullmatch(
-        pattern=r'''
-            (?:
-                (?P<replacement_rules> [\s\S]*? )
-                (?P<delimiter> ^ [%]{3,} )
-                \n
-            ) ?
-            (?P<main_content> [\s\S]* )
-        ''',
-        string=cmd,
-        flags=re.ASCII | re.MULTILINE | re.VERBOSE,
-    )
+    if isinstance(cmd, str):
+        newline, percent_sign = '\n', '%'
+    else:
+        newline, percent_sign = b'\n', b'%'
+
+    if percent_sign * 3 not in cmd:  # cannot contain «delimiter»
+        return cmd[:0], cmd
+
+    line_start = 0
+
+    while True:
+        line_end = cmd.find(newline, line_start)
+        if line_end < 0:  # no more complete lines, so no «delimiter»
+            return cmd[:0], cmd
 
-    replacement_rules = match.group('replacement_rules')
-    main_content = match.group('main_content')
+        line_length = line_end - line_start
+        if line_length >= 3 and cmd.count(percent_sign, line_start, line_end) == line_length:
+            replacement_rules = cmd[:line_start]
+            main_content = cmd[line_end + 1:]
+            return replacement_rules, main_content
 
-    return replacement_rules, main_content
+        line_start = line_end + 1
 
 
 def extract_separator_normalised_cmd_name(cmd_file_name: str) -> str:
-    cmd_name = re.sub(pattern=r'[.](cmd) \Z', repl='', string=none_to_empty_string(cmd_file_name), flags=re.VERBOSE)
+    cmd_name = none_to_empty_string(cmd_file_name).removesuffix('.cmd')
     separator_normalised_cmd_name = cmd_name.replace('\\', '/')
 
     return separator_normalised_cmd_name
 
 
+@functools.cache
+def compute_standard_rules_classified_lines() -> tuple[ClassifiedRulesLine, ...]:
+    """
+    Classify the lines of `STANDARD_RULES`, once per process rather than once per CMD file.
+    """
+    return tuple(classify_rules_lines(STANDARD_RULES))
+
+
 def cmd_to_html(cmd: str, cmd_file_name: str, verbose_mode_enabled: bool = False) -> str:
     """
     Convert CMD to HTML.
     """
-
     replacement_rules, main_content = extract_rules_and_content(cmd)
+
+    return rules_and_content_to_html(replacement_rules, main_content, cmd_file_name, verbose_mode_enabled)
+
+
+def rules_and_content_to_html(replacement_rules: str, main_content: str, cmd_file_name: str,
+                              verbose_mode_enabled: bool = False) -> str:
+    """
+    Convert CMD, already split into replacement rules and main content, to HTML.
+    """
+    return classified_rules_and_content_to_html(classify_rules_lines(replacement_rules), main_content, cmd_file_name,
+                                                verbose_mode_enabled)
+
+
+def classified_rules_and_content_to_html(classified_rules_lines: Iterable[ClassifiedRulesLine], main_content: str,
+                                         cmd_file_name: str, verbose_mode_enabled: bool = False) -> str:
+    """
+    Convert CMD, already split into replacement rules (classified line by line) and main content, to HTML.
+    """
     separator_normalised_cmd_name = extract_separator_normalised_cmd_name(cmd_file_name)
 
     replacement_authority = ReplacementAuthority(cmd_file_name, verbose_mode_enabled)
-    replacement_authority.legislate(
-        STANDARD_RULES,
+    replacement_authority.legislate_classified_lines(
+        compute_standard_rules_classified_lines(),
         rules_file_name='STANDARD_RULES',
         cmd_name=separator_normalised_cmd_name,
     )
-    replacement_authority.legislate(
-        replacement_rules,
+    replacement_authority.legislate_classified_lines(
+        classified_rules_lines,
         rules_file_name=cmd_file_name,
         cmd_name=separator_normalised_cmd_name,
     )
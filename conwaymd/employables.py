@@ -6,9 +6,9 @@ Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
 Classes for CMD replacement rules that are actually exposed to the user via CMD replacement rule syntax.
 """
 
-import copy
+import functools
 import re
-from typing import Callable, Optional
+from typing import Callable, Iterable, Mapping, Optional, Sequence
 
 from conwaymd.bases import (
     Replacement,
@@ -21,12 +21,18 @@ from conwaymd.bases import (
     ReplacementWithSyntaxType,
     ReplacementWithTagName,
 )
+from conwaymd.constants import (
+    REGEX_PATTERN_CACHE_MAX_SIZE,
+    REPLACE_CHAIN_MAX_PATTERN_COUNT,
+    SIMULTANEOUS_REGEX_CACHE_MAX_SIZE,
+)
 from conwaymd.exceptions import CommittedMutateException, MissingAttributeException, UnrecognisedLabelException
 from conwaymd.idioms import (
     build_attribute_specifications_regex,
     build_attributes_sequence,
     build_block_anchoring_regex,
     build_captured_character_class_regex,
+    build_character_class_regex,
     build_content_regex,
     build_extensible_delimiter_closing_regex,
     build_extensible_delimiter_opening_regex,
@@ -37,7 +43,8 @@ from conwaymd.idioms import (
 )
 from conwaymd.placeholders import PlaceholderMaster
 from conwaymd.references import ReferenceMaster
-from conwaymd.utilities import de_indent, none_to_empty_string
+from conwaymd.regexes import compile_regex
+from conwaymd.utilities import compose_translation_tables, de_indent, none_to_empty_string
 
 
 class ReplacementSequence(Replacement):
@@ -51,11 +58,14 @@ class ReplacementSequence(Replacement):
     - replacements: (def) NONE | #«id» [...]
     ````
     """
-    _replacements: list['Replacement']
+    __slots__ = (
+        '_replacements',
+    )
+    _replacements: tuple['Replacement', ...]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
-        self._replacements = []
+        self._replacements = ()
 
     @property
     def attribute_names(self) -> tuple[str, ...]:
@@ -65,7 +75,7 @@ class ReplacementSequence(Replacement):
         )
 
     @property
-    def replacements(self) -> list['Replacement']:
+    def replacements(self) -> tuple['Replacement', ...]:
         return self._replacements
 
     @replacements.setter
@@ -73,7 +83,7 @@ class ReplacementSequence(Replacement):
         if self._is_committed:
             raise CommittedMutateException('error: cannot set `replacements` after `commit()`')
 
-        self._replacements = copy.copy(value)
+        self._replacements = tuple(value)
 
     def _validate_mandatory_attributes(self):
         pass
@@ -102,6 +112,8 @@ class PlaceholderMarkerReplacement(Replacement):
     - queue_position: (def) NONE | ROOT | BEFORE #«id» | AFTER #«id»
     ````
     """
+    __slots__ = ()
+
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
 
@@ -131,6 +143,8 @@ class PlaceholderProtectionReplacement(Replacement):
     - queue_position: (def) NONE | ROOT | BEFORE #«id» | AFTER #«id»
     ````
     """
+    __slots__ = ()
+
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
 
@@ -159,6 +173,8 @@ class PlaceholderUnprotectionReplacement(Replacement):
     PlaceholderUnprotectionReplacement: #«id»
     - queue_position: (def) NONE | ROOT | BEFORE #«id» | AFTER #«id»
     """
+    __slots__ = ()
+
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
 
@@ -190,6 +206,8 @@ class DeIndentationReplacement(Replacement):
     - negative_flag: (def) NONE | «FLAG_NAME»
     ````
     """
+    __slots__ = ()
+
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
 
@@ -233,15 +251,26 @@ class OrdinaryDictionaryReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
+    __slots__ = (
+        '_apply_substitutions_simultaneously',
+        '_simultaneous_regex_pattern_compiled',
+        '_simultaneous_substitute_function',
+        '_translation_table',
+        '_uses_replace_chain',
+    )
     _apply_substitutions_simultaneously: bool
     _simultaneous_regex_pattern_compiled: Optional[re.Pattern]
     _simultaneous_substitute_function: Optional[Callable[[re.Match], str]]
+    _translation_table: Optional[dict[int, str]]
+    _uses_replace_chain: bool
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._apply_substitutions_simultaneously = True
         self._simultaneous_regex_pattern_compiled = None
         self._simultaneous_substitute_function = None
+        self._translation_table = None
+        self._uses_replace_chain = False
 
     @property
     def attribute_names(self) -> tuple[str, ...]:
@@ -268,25 +297,55 @@ class OrdinaryDictionaryReplacement(
         pass
 
     def _set_apply_method_variables(self):
+        self._translation_table = self.build_translation_table()
+        if self._translation_table is not None:  # scanned by `str.translate` rather than by a regex alternation
+            return
+
+        substitutions_are_independent = (
+            OrdinaryDictionaryReplacement.substitutions_are_independent(self._substitute_from_pattern)
+        )
+        if (
+            substitutions_are_independent
+            and len(self._substitute_from_pattern) <= REPLACE_CHAIN_MAX_PATTERN_COUNT
+            and (not self._apply_substitutions_simultaneously or len(self._concluding_replacements) == 0)
+        ):  # a few `str.replace` scans in C beat a regex scan calling back into Python per match
+            self._uses_replace_chain = True
+            return
+
         if self._apply_substitutions_simultaneously:
             self.set_simultaneous_apply_method_variables()
+        elif substitutions_are_independent:
+            self.set_fused_sequential_apply_method_variables()
 
     def _apply(self, string: str) -> str:
-        if self._apply_substitutions_simultaneously:
+        if self._translation_table is not None:
+            return string.translate(self._translation_table)
+
+        if self._apply_substitutions_simultaneously and not self._uses_replace_chain:
             return self.simultaneous_apply(string)
         else:
             return self.sequential_apply(string)
 
     def set_simultaneous_apply_method_variables(self):
-        self._simultaneous_regex_pattern_compiled = re.compile(
-            pattern=OrdinaryDictionaryReplacement.build_simultaneous_regex_pattern(self._substitute_from_pattern),
+        self._simultaneous_regex_pattern_compiled = (
+            OrdinaryDictionaryReplacement.compile_simultaneous_regex(tuple(self._substitute_from_pattern))
         )
         self._simultaneous_substitute_function = (
             self.build_simultaneous_substitute_function(self._substitute_from_pattern)
         )
 
     @staticmethod
-    def build_simultaneous_regex_pattern(substitute_from_pattern: dict[str, str]) -> str:
+    @functools.lru_cache(maxsize=SIMULTANEOUS_REGEX_CACHE_MAX_SIZE)
+    def compile_simultaneous_regex(patterns: tuple[str, ...]) -> re.Pattern:
+        """
+        Compile the alternation of patterns, once per distinct tuple of patterns.
+
+        Patterns are kept in order (rather than sorted), since earlier alternatives take precedence.
+        """
+        return compile_regex(pattern=OrdinaryDictionaryReplacement.build_simultaneous_regex_pattern(patterns))
+
+    @staticmethod
+    def build_simultaneous_regex_pattern(substitute_from_pattern: Iterable[str]) -> str:
         return '|'.join(
             re.escape(pattern)
             for pattern in substitute_from_pattern
@@ -294,36 +353,142 @@ class OrdinaryDictionaryReplacement(
 
     def build_simultaneous_substitute_function(self, substitute_from_pattern: dict[str, str],
                                                ) -> Callable[[re.Match], str]:
+        if len(self._concluding_replacements) == 0:  # the common case, where the substitute is a plain lookup
+            return OrdinaryDictionaryReplacement.build_lookup_substitute_function(substitute_from_pattern)
+
+        concluding_replacements = self._concluding_replacements
+
+        if (
+            not self._verbose_mode_enabled  # otherwise each application is printed
+            and all(is_pure_replacement(replacement) for replacement in concluding_replacements)
+        ):
+            concluded_substitute_from_pattern = {}
+
+            def memoised_substitute_function(match: re.Match) -> str:
+                pattern = match.group()
+                try:
+                    return concluded_substitute_from_pattern[pattern]
+                except KeyError:
+                    substitute = substitute_from_pattern[pattern]
+                    for replacement in concluding_replacements:
+                        substitute = replacement.apply(substitute)
+
+                    concluded_substitute_from_pattern[pattern] = substitute
+                    return substitute
+
+            return memoised_substitute_function
+
         def substitute_function(match: re.Match) -> str:
             pattern = match.group()
             substitute = substitute_from_pattern[pattern]
 
-            for replacement in self._concluding_replacements:
+            for replacement in concluding_replacements:
                 substitute = replacement.apply(substitute)
 
             return substitute
 
         return substitute_function
 
+    @staticmethod
+    def build_lookup_substitute_function(substitute_from_pattern: dict[str, str]) -> Callable[[re.Match], str]:
+        def substitute_function(match: re.Match) -> str:
+            return substitute_from_pattern[match.group()]
+
+        return substitute_function
+
     def simultaneous_apply(self, string: str) -> str:
-        if len(self._substitute_from_pattern) > 0:
-            string = re.sub(
-                pattern=self._simultaneous_regex_pattern_compiled,
-                repl=self._simultaneous_substitute_function,
-                string=string,
-            )
+        if len(self._substitute_from_pattern) == 0:
+            return string
 
-        return string
+        return self._simultaneous_regex_pattern_compiled.sub(self._simultaneous_substitute_function, string)
+
+    @staticmethod
+    def substitutions_are_independent(substitute_from_pattern: dict[str, str]) -> bool:
+        """
+        Whether applying substitutions sequentially is equivalent to applying them in a single pass.
+
+        This is the case when no substitution can create, destroy, or alter an occurrence of a later pattern, i.e.
+        - no pattern is empty or overlaps another (including containing it),
+        - no substitute is empty (which could join its surroundings into a later pattern), and
+        - no substitute shares a character with a later pattern.
+        """
+        patterns = list(substitute_from_pattern)
+
+        for index, pattern in enumerate(patterns):
+            substitute = substitute_from_pattern[pattern]
+            if pattern == '' or substitute == '':
+                return False
+
+            for later_pattern in patterns[index + 1:]:
+                if OrdinaryDictionaryReplacement.patterns_overlap(pattern, later_pattern):
+                    return False
+
+                if not set(substitute).isdisjoint(later_pattern):
+                    return False
+
+        return True
+
+    @staticmethod
+    def patterns_overlap(pattern: str, other_pattern: str) -> bool:
+        if pattern in other_pattern or other_pattern in pattern:
+            return True
+
+        for length in range(1, min(len(pattern), len(other_pattern))):
+            if pattern.endswith(other_pattern[:length]) or other_pattern.endswith(pattern[:length]):
+                return True
+
+        return False
+
+    def set_fused_sequential_apply_method_variables(self):
+        """
+        Set the variables for applying independent sequential substitutions in a single regex pass.
+
+        See `substitutions_are_independent`.
+        Unlike in simultaneous mode, concluding replacements are still applied to the whole string afterwards.
+        """
+        self._simultaneous_regex_pattern_compiled = (
+            OrdinaryDictionaryReplacement.compile_simultaneous_regex(tuple(self._substitute_from_pattern))
+        )
+        self._simultaneous_substitute_function = (
+            OrdinaryDictionaryReplacement.build_lookup_substitute_function(self._substitute_from_pattern)
+        )
 
     def sequential_apply(self, string: str) -> str:
-        for pattern, substitute in self._substitute_from_pattern.items():
-            string = string.replace(pattern, substitute)
+        if self._simultaneous_regex_pattern_compiled is not None:  # fused, see `substitutions_are_independent`
+            string = self._simultaneous_regex_pattern_compiled.sub(self._simultaneous_substitute_function, string)
+        else:
+            for pattern, substitute in self._substitute_from_pattern.items():
+                string = string.replace(pattern, substitute)
 
         for replacement in self._concluding_replacements:
             string = replacement.apply(string)
 
         return string
 
+    def build_translation_table(self) -> Optional[dict[int, str]]:
+        """
+        Build a `str.translate` table equivalent to `_apply`, if there is one.
+
+        There is one when every pattern is a single character and there are no concluding replacements.
+        """
+        if len(self._concluding_replacements) > 0:
+            return None
+
+        if any(len(pattern) != 1 for pattern in self._substitute_from_pattern):
+            return None
+
+        if self._apply_substitutions_simultaneously:
+            return {
+                ord(pattern): substitute
+                for pattern, substitute in self._substitute_from_pattern.items()
+            }
+
+        translation_table = {}
+        for pattern, substitute in self._substitute_from_pattern.items():
+            translation_table = compose_translation_tables(translation_table, {ord(pattern): substitute})
+
+        return translation_table
+
 
 class RegexDictionaryReplacement(
     ReplacementWithSubstitutions,
@@ -350,7 +515,10 @@ class RegexDictionaryReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
-    _substitute_function_from_pattern: dict[str, Callable[[re.Match], str]]
+    __slots__ = (
+        '_substitute_function_from_pattern',
+    )
+    _substitute_function_from_pattern: dict[re.Pattern, Callable[[re.Match], str]]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
@@ -370,17 +538,13 @@ class RegexDictionaryReplacement(
 
     def _set_apply_method_variables(self):
         for pattern, substitute in self._substitute_from_pattern.items():
+            pattern_compiled = compile_regex(pattern=pattern, flags=re.ASCII | re.MULTILINE | re.VERBOSE)
             substitute_function = self.build_substitute_function(substitute)
-            self._substitute_function_from_pattern[pattern] = substitute_function
+            self._substitute_function_from_pattern[pattern_compiled] = substitute_function
 
     def _apply(self, string: str) -> str:
-        for pattern, substitute_function in self._substitute_function_from_pattern.items():
-            string = re.sub(
-                pattern=pattern,
-                repl=substitute_function,
-                string=string,
-                flags=re.ASCII | re.MULTILINE | re.VERBOSE,
-            )
+        for pattern_compiled, substitute_function in self._substitute_function_from_pattern.items():
+            string = pattern_compiled.sub(substitute_function, string)  # skips the `re` module's cache lookup
 
         return string
 
@@ -423,8 +587,18 @@ class FixedDelimitersReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
+    __slots__ = (
+        '_opening_delimiter',
+        '_closing_delimiter',
+        '_opening_literal',
+        '_closing_literal',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _opening_delimiter: Optional[str]
     _closing_delimiter: Optional[str]
+    _opening_literal: Optional[str]
+    _closing_literal: Optional[str]
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -432,6 +606,8 @@ class FixedDelimitersReplacement(
         super().__init__(id_, verbose_mode_enabled)
         self._opening_delimiter = None
         self._closing_delimiter = None
+        self._opening_literal = None
+        self._closing_literal = None
         self._regex_pattern_compiled = None
         self._substitute_function = None
 
@@ -484,7 +660,9 @@ class FixedDelimitersReplacement(
 
     def _set_apply_method_variables(self):
         self._has_flags = len(self._flag_name_from_letter) > 0
-        self._regex_pattern_compiled = re.compile(
+        self._opening_literal = self._opening_delimiter
+        self._closing_literal = self._closing_delimiter
+        self._regex_pattern_compiled = compile_regex(
             pattern=FixedDelimitersReplacement.build_regex_pattern(self._syntax_type_is_block,
                                                                    self._flag_name_from_letter, self._has_flags,
                                                                    self._opening_delimiter,
@@ -493,15 +671,19 @@ class FixedDelimitersReplacement(
                                                                    self._closing_delimiter),
             flags=re.ASCII | re.MULTILINE | re.VERBOSE,
         )
-        self._substitute_function = self.build_substitute_function(self._flag_name_from_letter, self._has_flags,
-                                                                   self._attribute_specifications, self._tag_name)
+        self._substitute_function = self.build_substitute_function(self._attribute_specifications, self._tag_name)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if self._opening_literal not in string:  # every match contains it, and `in` is much cheaper than a regex scan
+            return string
+
+        if self._closing_literal not in string:  # likewise
+            return string
+
+        if self._opening_literal == self._closing_literal and string.count(self._opening_literal) < 2:
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
     def build_regex_pattern(syntax_type_is_block: bool, flag_name_from_letter: dict[str, str], has_flags: bool,
@@ -526,39 +708,12 @@ class FixedDelimitersReplacement(
             closing_delimiter_regex
         ])
 
-    def build_substitute_function(self, flag_name_from_letter: dict[str, str], has_flags: bool,
-                                  attribute_specifications: Optional[str], tag_name: Optional[str],
+    def build_substitute_function(self, attribute_specifications: Optional[str], tag_name: Optional[str],
                                   ) -> Callable[[re.Match], str]:
-        def substitute_function(match: re.Match) -> str:
-            enabled_flag_names = ReplacementWithAllowedFlags.get_enabled_flag_names(match, flag_name_from_letter,
-                                                                                    has_flags)
-
-            if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
-                )
-                attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
-            else:
-                attributes_sequence = ''
-
-            content = match.group('content')
-            for replacement in self._content_replacements:
-                content = replacement.apply(content, enabled_flag_names)
-
-            if tag_name is None:
-                substitute = content
-            else:
-                substitute = f'<{tag_name}{attributes_sequence}>{content}</{tag_name}>'
-
-            for replacement in self._concluding_replacements:
-                substitute = replacement.apply(substitute, enabled_flag_names)
-
-            return substitute
-
-        return substitute_function
+        return build_enclosing_substitute_function(self._regex_pattern_compiled, self._flag_bit_from_letter,
+                                                   attribute_specifications, self._content_replacements,
+                                                   tag_name, '', self._concluding_replacements,
+                                                   self._verbose_mode_enabled)
 
 
 class ExtensibleFenceReplacement(
@@ -591,10 +746,24 @@ class ExtensibleFenceReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
+    __slots__ = (
+        '_prologue_delimiter',
+        '_extensible_delimiter_character',
+        '_extensible_delimiter_min_length',
+        '_epilogue_delimiter',
+        '_minimal_delimiter_run',
+        '_opening_literal',
+        '_closing_literal',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _prologue_delimiter: str
     _extensible_delimiter_character: Optional[str]
     _extensible_delimiter_min_length: Optional[int]
     _epilogue_delimiter: str
+    _minimal_delimiter_run: Optional[str]
+    _opening_literal: Optional[str]
+    _closing_literal: Optional[str]
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -604,6 +773,9 @@ class ExtensibleFenceReplacement(
         self._extensible_delimiter_character = None
         self._extensible_delimiter_min_length = None
         self._epilogue_delimiter = ''
+        self._minimal_delimiter_run = None
+        self._opening_literal = None
+        self._closing_literal = None
         self._regex_pattern_compiled = None
         self._substitute_function = None
 
@@ -676,7 +848,10 @@ class ExtensibleFenceReplacement(
 
     def _set_apply_method_variables(self):
         self._has_flags = len(self._flag_name_from_letter) > 0
-        self._regex_pattern_compiled = re.compile(
+        self._minimal_delimiter_run = self._extensible_delimiter_character * self._extensible_delimiter_min_length
+        self._opening_literal = self._prologue_delimiter + self._minimal_delimiter_run
+        self._closing_literal = self._minimal_delimiter_run + self._epilogue_delimiter
+        self._regex_pattern_compiled = compile_regex(
             pattern=ExtensibleFenceReplacement.build_regex_pattern(
                 self._syntax_type_is_block,
                 self._flag_name_from_letter,
@@ -690,19 +865,19 @@ class ExtensibleFenceReplacement(
             ),
             flags=re.ASCII | re.MULTILINE | re.VERBOSE,
         )
-        self._substitute_function = self.build_substitute_function(
-            self._flag_name_from_letter,
-            self._has_flags,
-            self._attribute_specifications,
-            self._tag_name,
-        )
+        self._substitute_function = self.build_substitute_function(self._attribute_specifications, self._tag_name)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if self._opening_literal not in string:  # every match contains it, and `in` is much cheaper than a regex scan
+            return string
+
+        if self._closing_literal not in string:  # likewise
+            return string
+
+        if string.count(self._minimal_delimiter_run) < 2:  # the opening and closing runs each contain one
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
     def build_regex_pattern(syntax_type_is_block: bool, flag_name_from_letter: dict[str, str], has_flags: bool,
@@ -734,39 +909,12 @@ class ExtensibleFenceReplacement(
             epilogue_delimiter_regex,
         ])
 
-    def build_substitute_function(self, flag_name_from_letter: dict[str, str], has_flags: bool,
-                                  attribute_specifications: Optional[str], tag_name: Optional[str],
+    def build_substitute_function(self, attribute_specifications: Optional[str], tag_name: Optional[str],
                                   ) -> Callable[[re.Match], str]:
-        def substitute_function(match: re.Match) -> str:
-            enabled_flag_names = ReplacementWithAllowedFlags.get_enabled_flag_names(match,
-                                                                                    flag_name_from_letter, has_flags)
-
-            if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
-                )
-                attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
-            else:
-                attributes_sequence = ''
-
-            content = match.group('content')
-            for replacement in self._content_replacements:
-                content = replacement.apply(content, enabled_flag_names)
-
-            if tag_name is None:
-                substitute = content
-            else:
-                substitute = f'<{tag_name}{attributes_sequence}>{content}</{tag_name}>'
-
-            for replacement in self._concluding_replacements:
-                substitute = replacement.apply(substitute, enabled_flag_names)
-
-            return substitute
-
-        return substitute_function
+        return build_enclosing_substitute_function(self._regex_pattern_compiled, self._flag_bit_from_letter,
+                                                   attribute_specifications, self._content_replacements,
+                                                   tag_name, '', self._concluding_replacements,
+                                                   self._verbose_mode_enabled)
 
 
 class PartitioningReplacement(
@@ -793,6 +941,12 @@ class PartitioningReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
+    __slots__ = (
+        '_starting_pattern',
+        '_ending_pattern',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _starting_pattern: Optional[str]
     _ending_pattern: Optional[str]
     _regex_pattern_compiled: Optional[re.Pattern]
@@ -844,7 +998,7 @@ class PartitioningReplacement(
             raise MissingAttributeException('starting_pattern')
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=PartitioningReplacement.build_regex_pattern(
                 self._starting_pattern,
                 self._attribute_specifications,
@@ -855,13 +1009,10 @@ class PartitioningReplacement(
         self._substitute_function = self.build_substitute_function(self._attribute_specifications, self._tag_name)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(starting_pattern: str, attribute_specifications: Optional[str],
                             ending_pattern: Optional[str]) -> str:
         anchoring_regex = build_block_anchoring_regex(syntax_type_is_block=True)
@@ -912,33 +1063,10 @@ class PartitioningReplacement(
 
     def build_substitute_function(self, attribute_specifications: Optional[str], tag_name: Optional[str],
                                   ) -> Callable[[re.Match], str]:
-        def substitute_function(match: re.Match) -> str:
-            if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
-                )
-                attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
-            else:
-                attributes_sequence = ''
-
-            content = match.group('content')
-            for replacement in self._content_replacements:
-                content = replacement.apply(content)
-
-            if tag_name is None:
-                substitute = content
-            else:
-                substitute = f'<{tag_name}{attributes_sequence}>{content}</{tag_name}>\n'
-
-            for replacement in self._concluding_replacements:
-                substitute = replacement.apply(substitute)
-
-            return substitute
-
-        return substitute_function
+        return build_enclosing_substitute_function(self._regex_pattern_compiled, None,
+                                                   attribute_specifications, self._content_replacements,
+                                                   tag_name, '\n', self._concluding_replacements,
+                                                   self._verbose_mode_enabled)
 
 
 class InlineAssortedDelimitersReplacement(
@@ -959,13 +1087,21 @@ class InlineAssortedDelimitersReplacement(
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = (
+        '_tag_name_from_delimiter_length_from_character',
+        '_delimiter_characters',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _tag_name_from_delimiter_length_from_character: dict[str, dict[int, str]]
+    _delimiter_characters: tuple[str, ...]
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
     def __init__(self, id_: str, verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._tag_name_from_delimiter_length_from_character = {}
+        self._delimiter_characters = ()
         self._regex_pattern_compiled = None
         self._substitute_function = None
 
@@ -987,14 +1123,18 @@ class InlineAssortedDelimitersReplacement(
         if self._is_committed:
             raise CommittedMutateException('error: cannot call `add_delimiter_conversion(...)` after `commit()`')
 
-        self._tag_name_from_delimiter_length_from_character = copy.deepcopy(value)
+        self._tag_name_from_delimiter_length_from_character = {  # tag names are strings, so inner copies suffice
+            character: dict(tag_name_from_delimiter_length)
+            for character, tag_name_from_delimiter_length in value.items()
+        }
 
     def _validate_mandatory_attributes(self):
         if len(self._tag_name_from_delimiter_length_from_character) == 0:
             raise MissingAttributeException('delimiter_conversion')
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._delimiter_characters = tuple(self._tag_name_from_delimiter_length_from_character)
+        self._regex_pattern_compiled = compile_regex(
             pattern=InlineAssortedDelimitersReplacement.build_regex_pattern(
                 self._tag_name_from_delimiter_length_from_character,
                 self._attribute_specifications,
@@ -1008,39 +1148,45 @@ class InlineAssortedDelimitersReplacement(
         )
 
     def _apply(self, string: str) -> str:
-        string_has_changed = True
+        substitution_count = 1
 
-        while string_has_changed:
-            new_string = re.sub(pattern=self._regex_pattern_compiled, repl=self._substitute_function, string=string)
-            string_has_changed = new_string != string
-            string = new_string
+        while substitution_count > 0:  # a substitution can complete an enclosing match (e.g. `*a **b** c*`)
+            if not any(character in string for character in self._delimiter_characters):  # cannot match
+                break
+
+            string, substitution_count = self._regex_pattern_compiled.subn(self._substitute_function, string)
 
         return string
 
     def build_substitute_function(self, tag_name_from_delimiter_length_from_character: dict[str, dict[int, str]],
                                   attribute_specifications: Optional[str],
                                   ) -> Callable[[re.Match], str]:
+        tags_from_delimiter = {  # built once, and keyed by delimiter so that a match needs only one lookup
+            character * length: (f'<{tag_name}', f'</{tag_name}>')
+            for character, tag_name_from_delimiter_length in tag_name_from_delimiter_length_from_character.items()
+            for length, tag_name in tag_name_from_delimiter_length.items()
+        }
+        group_index_from_name = self._regex_pattern_compiled.groupindex
+        delimiter_group_index = group_index_from_name['delimiter']
+        attribute_specifications_group_index = group_index_from_name.get('attribute_specifications')
+        content_group_index = group_index_from_name['content']
+        apply = self.apply
+
         def substitute_function(match: re.Match) -> str:
-            character = match.group('delimiter_character')
-            delimiter = match.group('delimiter')
-            length = len(delimiter)
-            tag_name = tag_name_from_delimiter_length_from_character[character][length]
+            opening_tag_start, closing_tag = tags_from_delimiter[match.group(delimiter_group_index)]
 
             if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
+                combined_attribute_specifications = combine_attribute_specifications(
+                    attribute_specifications,
+                    match.group(attribute_specifications_group_index),
                 )
                 attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
             else:
                 attributes_sequence = ''
 
-            content = match.group('content')
-            content = self.apply(content)
+            content = apply(match.group(content_group_index))
 
-            substitute = f'<{tag_name}{attributes_sequence}>{content}</{tag_name}>'
+            substitute = f'{opening_tag_start}{attributes_sequence}>{content}{closing_tag}'
 
             return substitute
 
@@ -1070,27 +1216,43 @@ class InlineAssortedDelimitersReplacement(
                 double_characters.add(character)
                 all_characters.add(character)
 
-        single_class_regex = build_captured_character_class_regex(single_characters, 'single')
-        either_class_regex = build_captured_character_class_regex(either_characters, 'either')
-        double_class_regex = build_captured_character_class_regex(double_characters, 'double')
-        class_regexes = [double_class_regex, either_class_regex, single_class_regex]
-        delimiter_character_alternatives = ' | '.join(
-            class_regex
-            for class_regex in class_regexes
-            if class_regex is not None
+        present_class_count = sum(
+            len(characters) > 0
+            for characters in [single_characters, either_characters, double_characters]
         )
-        delimiter_character_regex = f'(?P<delimiter_character> {delimiter_character_alternatives} )'
 
-        if either_class_regex is not None:
-            if double_class_regex is not None:
-                repetition_regex = '(?(double) (?P=double) | (?(either) (?P=either)? ) )'
+        if present_class_count == 1:  # the delimiter character alone determines the repetition
+            all_class_regex = build_character_class_regex(all_characters)
+            delimiter_character_regex = f'(?P<delimiter_character> {all_class_regex} )'
+
+            if len(either_characters) > 0:
+                repetition_regex = '(?P=delimiter_character)?'
+            elif len(double_characters) > 0:
+                repetition_regex = '(?P=delimiter_character)'
             else:
-                repetition_regex = '(?(either) (?P=either)? )'
+                repetition_regex = ''
         else:
-            if double_class_regex is not None:
-                repetition_regex = '(?(double) (?P=double) )'
+            single_class_regex = build_character_class_regex(single_characters)  # never tested, so not captured
+            either_class_regex = build_captured_character_class_regex(either_characters, 'either')
+            double_class_regex = build_captured_character_class_regex(double_characters, 'double')
+            class_regexes = [double_class_regex, either_class_regex, single_class_regex]
+            delimiter_character_alternatives = ' | '.join(
+                class_regex
+                for class_regex in class_regexes
+                if class_regex is not None
+            )
+            delimiter_character_regex = f'(?P<delimiter_character> {delimiter_character_alternatives} )'
+
+            if either_class_regex is not None:
+                if double_class_regex is not None:
+                    repetition_regex = '(?(double) (?P=double) | (?(either) (?P=either)? ) )'
+                else:
+                    repetition_regex = '(?(either) (?P=either)? )'
             else:
-                repetition_regex = ''
+                if double_class_regex is not None:
+                    repetition_regex = '(?(double) (?P=double) )'
+                else:
+                    repetition_regex = ''
 
         opening_delimiter_regex = f'(?P<delimiter> {delimiter_character_regex} {repetition_regex} )'
 
@@ -1136,6 +1298,10 @@ class HeadingReplacement(
     - attribute_specifications: (def) NONE | EMPTY | «string»
     ````
     """
+    __slots__ = (
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -1155,20 +1321,20 @@ class HeadingReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=HeadingReplacement.build_regex_pattern(self._attribute_specifications),
             flags=re.ASCII | re.MULTILINE | re.VERBOSE,
         )
         self._substitute_function = HeadingReplacement.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '#' not in string:  # every heading has opening hashes
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str]) -> str:
         block_anchoring_regex = build_block_anchoring_regex(syntax_type_is_block=True,
                                                             capture_anchoring_whitespace=True)
@@ -1194,17 +1360,18 @@ class HeadingReplacement(
 
     @staticmethod
     def build_substitute_function(attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+        tags_from_opening_hashes = {  # built once, and keyed by opening hashes so that a match needs only one lookup
+            '#' * heading_level: (f'<h{heading_level}', f'</h{heading_level}>')
+            for heading_level in range(1, 7)
+        }
+
         def substitute_function(match: re.Match) -> str:
-            opening_hashes = match.group('opening_hashes')
-            heading_level = len(opening_hashes)
-            tag_name = f'h{heading_level}'
+            opening_tag_start, closing_tag = tags_from_opening_hashes[match.group('opening_hashes')]
 
             if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
+                combined_attribute_specifications = combine_attribute_specifications(
+                    attribute_specifications,
+                    match.group('attribute_specifications'),
                 )
                 attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
             else:
@@ -1212,9 +1379,9 @@ class HeadingReplacement(
 
             content_starter = match.group('content_starter')
             content_continuation = match.group('content_continuation')
-            content = none_to_empty_string(content_starter) + content_continuation
+            content = (content_starter or '') + content_continuation
 
-            substitute = f'<{tag_name}{attributes_sequence}>{content}</{tag_name}>'
+            substitute = f'{opening_tag_start}{attributes_sequence}>{content}{closing_tag}'
 
             return substitute
 
@@ -1235,6 +1402,11 @@ class ReferenceDefinitionReplacement(
     - attribute_specifications: (def) NONE | EMPTY | «string»
     ````
     """
+    __slots__ = (
+        '_reference_master',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _reference_master: 'ReferenceMaster'
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
@@ -1256,20 +1428,20 @@ class ReferenceDefinitionReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=ReferenceDefinitionReplacement.build_regex_pattern(self._attribute_specifications),
             flags=re.ASCII | re.MULTILINE | re.VERBOSE,
         )
         self._substitute_function = self.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '[' not in string:  # every definition starts with a bracketed label
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str]) -> str:
         block_anchoring_regex = build_block_anchoring_regex(syntax_type_is_block=True,
                                                             capture_anchoring_whitespace=True)
@@ -1299,11 +1471,9 @@ class ReferenceDefinitionReplacement(
             label = match.group('label')
 
             if attribute_specifications is not None:
-                matched_attribute_specifications = match.group('attribute_specifications')
-                combined_attribute_specifications = (
-                    attribute_specifications
-                    + ' '
-                    + none_to_empty_string(matched_attribute_specifications)
+                combined_attribute_specifications = combine_attribute_specifications(
+                    attribute_specifications,
+                    match.group('attribute_specifications'),
                 )
             else:
                 combined_attribute_specifications = ''
@@ -1343,6 +1513,10 @@ class SpecifiedImageReplacement(
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = (
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -1363,7 +1537,7 @@ class SpecifiedImageReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=SpecifiedImageReplacement.build_regex_pattern(
                 self._attribute_specifications,
                 self._prohibited_content_regex,
@@ -1373,13 +1547,13 @@ class SpecifiedImageReplacement(
         self._substitute_function = SpecifiedImageReplacement.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '![' not in string:  # every match starts with it
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str], prohibited_content_regex: Optional[str]) -> str:
         exclamation_mark_regex = '[!]'
         alt_text_regex = build_content_regex(prohibited_content_regex,
@@ -1408,9 +1582,11 @@ class SpecifiedImageReplacement(
 
     @staticmethod
     def build_substitute_function(attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+        protect = PlaceholderMaster.protect  # bound once rather than looked up per match
+
         def substitute_function(match: re.Match) -> str:
             alt = match.group('alt_text')
-            alt_protected = PlaceholderMaster.protect(alt)
+            alt_protected = protect(alt)
             alt_attribute_specification = f'alt={alt_protected}'
 
             angle_bracketed_uri = match.group('angle_bracketed_uri')
@@ -1419,7 +1595,7 @@ class SpecifiedImageReplacement(
             else:
                 src = match.group('bare_uri')
 
-            src_protected = PlaceholderMaster.protect(none_to_empty_string(src))
+            src_protected = protect(src or '')
             src_attribute_specification = f'src={src_protected}'
 
             double_quoted_title = match.group('double_quoted_title')
@@ -1429,7 +1605,7 @@ class SpecifiedImageReplacement(
                 title = match.group('single_quoted_title')
 
             if title is not None:
-                title_protected = PlaceholderMaster.protect(title)
+                title_protected = protect(title)
                 title_attribute_specification = f'title={title_protected}'
             else:
                 title_attribute_specification = ''
@@ -1445,7 +1621,7 @@ class SpecifiedImageReplacement(
                 combined_attribute_specifications = ' '.join([
                     alt_src_title_attribute_specifications,
                     attribute_specifications,
-                    none_to_empty_string(matched_attribute_specifications),
+                    (matched_attribute_specifications or ''),
                 ])
             else:
                 combined_attribute_specifications = alt_src_title_attribute_specifications
@@ -1475,13 +1651,21 @@ class ReferencedImageReplacement(
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = (
+        '_reference_master',
+        '_src_title_referenced_attribute_specifications_from_label',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _reference_master: 'ReferenceMaster'
+    _src_title_referenced_attribute_specifications_from_label: dict[str, Optional[str]]
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
     def __init__(self, id_: str, reference_master: 'ReferenceMaster', verbose_mode_enabled: bool):
         super().__init__(id_, verbose_mode_enabled)
         self._reference_master = reference_master
+        self._src_title_referenced_attribute_specifications_from_label = {}
         self._regex_pattern_compiled = None
         self._substitute_function = None
 
@@ -1497,7 +1681,7 @@ class ReferencedImageReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=ReferencedImageReplacement.build_regex_pattern(
                 self._attribute_specifications,
                 self._prohibited_content_regex,
@@ -1507,13 +1691,14 @@ class ReferencedImageReplacement(
         self._substitute_function = self.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '![' not in string:  # every match starts with it
+            return string
+
+        self._src_title_referenced_attribute_specifications_from_label.clear()  # definitions may change between calls
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str], prohibited_content_regex: Optional[str]) -> str:
         exclamation_mark_regex = '[!]'
         alt_text_regex = build_content_regex(prohibited_content_regex,
@@ -1533,9 +1718,14 @@ class ReferencedImageReplacement(
         ])
 
     def build_substitute_function(self, attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+        protect = PlaceholderMaster.protect
+        src_title_referenced_attribute_specifications_from_label = (
+            self._src_title_referenced_attribute_specifications_from_label  # cleared (not rebound) by `_apply`
+        )
+
         def substitute_function(match: re.Match) -> str:
             alt = match.group('alt_text')
-            alt_protected = PlaceholderMaster.protect(alt)
+            alt_protected = protect(alt)
             alt_attribute_specification = f'alt={alt_protected}'
 
             label = match.group('label')
@@ -1543,32 +1733,30 @@ class ReferencedImageReplacement(
                 label = alt
 
             try:
-                referenced_attribute_specifications, src, title = self._reference_master.load_definition(label)
-            except UnrecognisedLabelException:
-                return match.group()
-
-            src_protected = PlaceholderMaster.protect(none_to_empty_string(src))
-            src_attribute_specification = f'src={src_protected}'
+                src_title_referenced_attribute_specifications = (
+                    src_title_referenced_attribute_specifications_from_label[label]
+                )
+            except KeyError:
+                src_title_referenced_attribute_specifications = (
+                    self.build_src_title_referenced_attribute_specifications(label)
+                )
+                src_title_referenced_attribute_specifications_from_label[label] = (
+                    src_title_referenced_attribute_specifications
+                )
 
-            if title is not None:
-                title_protected = PlaceholderMaster.protect(title)
-                title_attribute_specification = f'title={title_protected}'
-            else:
-                title_attribute_specification = ''
+            if src_title_referenced_attribute_specifications is None:  # unrecognised label
+                return match.group()
 
-            alt_src_title_referenced_attribute_specifications = ' '.join([
-                alt_attribute_specification,
-                src_attribute_specification,
-                title_attribute_specification,
-                none_to_empty_string(referenced_attribute_specifications)
-            ])
+            alt_src_title_referenced_attribute_specifications = (
+                f'{alt_attribute_specification} {src_title_referenced_attribute_specifications}'
+            )
 
             if attribute_specifications is not None:
                 matched_attribute_specifications = match.group('attribute_specifications')
                 combined_attribute_specifications = ' '.join([
                     alt_src_title_referenced_attribute_specifications,
                     attribute_specifications,
-                    none_to_empty_string(matched_attribute_specifications),
+                    (matched_attribute_specifications or ''),
                 ])
             else:
                 combined_attribute_specifications = alt_src_title_referenced_attribute_specifications
@@ -1581,6 +1769,30 @@ class ReferencedImageReplacement(
 
         return substitute_function
 
+    def build_src_title_referenced_attribute_specifications(self, label: str) -> Optional[str]:
+        """
+        Build the attribute specifications coming from the reference definition of a label (None if unrecognised).
+        """
+        try:
+            referenced_attribute_specifications, src, title = self._reference_master.load_definition(label)
+        except UnrecognisedLabelException:
+            return None
+
+        src_protected = PlaceholderMaster.protect(none_to_empty_string(src))
+        src_attribute_specification = f'src={src_protected}'
+
+        if title is not None:
+            title_protected = PlaceholderMaster.protect(title)
+            title_attribute_specification = f'title={title_protected}'
+        else:
+            title_attribute_specification = ''
+
+        return ' '.join([
+            src_attribute_specification,
+            title_attribute_specification,
+            none_to_empty_string(referenced_attribute_specifications)
+        ])
+
 
 class ExplicitLinkReplacement(
     ReplacementWithAllowedFlags,
@@ -1602,6 +1814,10 @@ class ExplicitLinkReplacement(
     - concluding_replacements: (def) NONE | #«id» [...]
     ````
     """
+    __slots__ = (
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -1625,7 +1841,7 @@ class ExplicitLinkReplacement(
 
     def _set_apply_method_variables(self):
         self._has_flags = len(self._flag_name_from_letter) > 0
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=ExplicitLinkReplacement.build_regex_pattern(
                 self._flag_name_from_letter,
                 self._has_flags,
@@ -1633,18 +1849,13 @@ class ExplicitLinkReplacement(
             ),
             flags=re.ASCII | re.VERBOSE,
         )
-        self._substitute_function = self.build_substitute_function(
-            self._flag_name_from_letter,
-            self._has_flags,
-            self._attribute_specifications,
-        )
+        self._substitute_function = self.build_substitute_function(self._has_flags, self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '<' not in string:  # every link starts with an opening angle bracket
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
     def build_regex_pattern(flag_name_from_letter: dict[str, str], has_flags: bool,
@@ -1664,34 +1875,38 @@ class ExplicitLinkReplacement(
             closing_angle_bracket_regex,
         ])
 
-    def build_substitute_function(self, flag_name_from_letter: dict[str, str], has_flags: bool,
-                                  attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+    def build_substitute_function(self, has_flags: bool, attribute_specifications: Optional[str],
+                                  ) -> Callable[[re.Match], str]:
+        flag_bit_from_letter = self._flag_bit_from_letter
+        apply_content_replacements = build_replacements_applier(self._content_replacements,
+                                                                self._verbose_mode_enabled)
+        apply_concluding_replacements = build_replacements_applier(self._concluding_replacements,
+                                                                   self._verbose_mode_enabled)
+        protect = PlaceholderMaster.protect
+
         def substitute_function(match: re.Match) -> str:
-            enabled_flag_names = ReplacementWithAllowedFlags.get_enabled_flag_names(match,
-                                                                                    flag_name_from_letter, has_flags)
+            if has_flags:
+                enabled_flag_bits = ReplacementWithAllowedFlags.get_enabled_flag_bits(match, flag_bit_from_letter)
+            else:
+                enabled_flag_bits = 0
 
             href = match.group('uri')
-            href_protected = PlaceholderMaster.protect(href)
+            href_protected = protect(href)
             href_attribute_specification = f'href={href_protected}'
 
             if attribute_specifications is not None:
                 matched_attribute_specifications = match.group('attribute_specifications')
                 combined_attribute_specifications = ' '.join([
                     href_attribute_specification,
-                    none_to_empty_string(matched_attribute_specifications),
+                    (matched_attribute_specifications or ''),
                 ])
             else:
                 combined_attribute_specifications = href_attribute_specification
 
             attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
 
-            content = href
-            for replacement in self._content_replacements:
-                content = replacement.apply(content, enabled_flag_names)
-
-            substitute = f'<a{attributes_sequence}>{content}</a>'
-            for replacement in self._concluding_replacements:
-                substitute = replacement.apply(substitute, enabled_flag_names)
+            content = apply_content_replacements(href, enabled_flag_bits)
+            substitute = apply_concluding_replacements(f'<a{attributes_sequence}>{content}</a>', enabled_flag_bits)
 
             return substitute
 
@@ -1714,6 +1929,10 @@ class SpecifiedLinkReplacement(
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = (
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
 
@@ -1734,7 +1953,7 @@ class SpecifiedLinkReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=SpecifiedLinkReplacement.build_regex_pattern(
                 self._attribute_specifications,
                 self._prohibited_content_regex,
@@ -1744,13 +1963,13 @@ class SpecifiedLinkReplacement(
         self._substitute_function = SpecifiedLinkReplacement.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '[' not in string or '(' not in string:  # every link has bracketed text then a parenthesised URI
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str], prohibited_content_regex: Optional[str]) -> str:
         link_text_regex = build_content_regex(prohibited_content_regex,
                                               permitted_content_regex=r'[^\]]', capture_group_name='link_text')
@@ -1777,6 +1996,8 @@ class SpecifiedLinkReplacement(
 
     @staticmethod
     def build_substitute_function(attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+        protect = PlaceholderMaster.protect
+
         def substitute_function(match: re.Match) -> str:
             content = match.group('link_text')
 
@@ -1787,7 +2008,7 @@ class SpecifiedLinkReplacement(
                 href = match.group('bare_uri')
 
             if href is not None:
-                href_protected = PlaceholderMaster.protect(href)
+                href_protected = protect(href)
                 href_attribute_specification = f'href={href_protected}'
             else:
                 href_attribute_specification = ''
@@ -1799,7 +2020,7 @@ class SpecifiedLinkReplacement(
                 title = match.group('single_quoted_title')
 
             if title is not None:
-                title_protected = PlaceholderMaster.protect(title)
+                title_protected = protect(title)
                 title_attribute_specification = f'title={title_protected}'
             else:
                 title_attribute_specification = ''
@@ -1814,7 +2035,7 @@ class SpecifiedLinkReplacement(
                 combined_attribute_specifications = ' '.join([
                     href_title_attribute_specifications,
                     attribute_specifications,
-                    none_to_empty_string(matched_attribute_specifications),
+                    (matched_attribute_specifications or ''),
                 ])
             else:
                 combined_attribute_specifications = href_title_attribute_specifications
@@ -1844,6 +2065,11 @@ class ReferencedLinkReplacement(
     - prohibited_content: (def) NONE | BLOCKS | ANCHORED_BLOCKS
     ````
     """
+    __slots__ = (
+        '_reference_master',
+        '_regex_pattern_compiled',
+        '_substitute_function',
+    )
     _reference_master: 'ReferenceMaster'
     _regex_pattern_compiled: Optional[re.Pattern]
     _substitute_function: Optional[Callable[[re.Match], str]]
@@ -1866,7 +2092,7 @@ class ReferencedLinkReplacement(
         pass
 
     def _set_apply_method_variables(self):
-        self._regex_pattern_compiled = re.compile(
+        self._regex_pattern_compiled = compile_regex(
             pattern=ReferencedLinkReplacement.build_regex_pattern(
                 self._attribute_specifications,
                 self._prohibited_content_regex,
@@ -1876,13 +2102,13 @@ class ReferencedLinkReplacement(
         self._substitute_function = self.build_substitute_function(self._attribute_specifications)
 
     def _apply(self, string: str) -> str:
-        return re.sub(
-            pattern=self._regex_pattern_compiled,
-            repl=self._substitute_function,
-            string=string,
-        )
+        if '[' not in string:  # every link starts with bracketed text
+            return string
+
+        return self._regex_pattern_compiled.sub(self._substitute_function, string)
 
     @staticmethod
+    @functools.lru_cache(maxsize=REGEX_PATTERN_CACHE_MAX_SIZE)
     def build_regex_pattern(attribute_specifications: Optional[str], prohibited_content_regex: Optional[str]) -> str:
         link_text_regex = build_content_regex(prohibited_content_regex,
                                               permitted_content_regex=r'[^\]]', capture_group_name='link_text')
@@ -1900,6 +2126,9 @@ class ReferencedLinkReplacement(
         ])
 
     def build_substitute_function(self, attribute_specifications: Optional[str]) -> Callable[[re.Match], str]:
+        protect = PlaceholderMaster.protect
+        load_definition = self._reference_master.load_definition
+
         def substitute_function(match: re.Match) -> str:
             content = match.group('link_text')
 
@@ -1908,18 +2137,18 @@ class ReferencedLinkReplacement(
                 label = content
 
             try:
-                referenced_attribute_specifications, href, title = self._reference_master.load_definition(label)
+                referenced_attribute_specifications, href, title = load_definition(label)
             except UnrecognisedLabelException:
                 return match.group()
 
             if href is not None:
-                href_protected = PlaceholderMaster.protect(href)
+                href_protected = protect(href)
                 href_attribute_specification = f'href={href_protected}'
             else:
                 href_attribute_specification = ''
 
             if title is not None:
-                title_protected = PlaceholderMaster.protect(title)
+                title_protected = protect(title)
                 title_attribute_specification = f'title={title_protected}'
             else:
                 title_attribute_specification = ''
@@ -1927,7 +2156,7 @@ class ReferencedLinkReplacement(
             href_title_referenced_attribute_specifications = ' '.join([
                 href_attribute_specification,
                 title_attribute_specification,
-                none_to_empty_string(referenced_attribute_specifications)
+                (referenced_attribute_specifications or '')
             ])
 
             if attribute_specifications is not None:
@@ -1935,7 +2164,7 @@ class ReferencedLinkReplacement(
                 combined_attribute_specifications = ' '.join([
                     href_title_referenced_attribute_specifications,
                     attribute_specifications,
-                    none_to_empty_string(matched_attribute_specifications),
+                    (matched_attribute_specifications or ''),
                 ])
             else:
                 combined_attribute_specifications = href_title_referenced_attribute_specifications
@@ -1947,3 +2176,148 @@ class ReferencedLinkReplacement(
             return substitute
 
         return substitute_function
+
+
+def is_pure_replacement(replacement: Replacement) -> bool:
+    """
+    Whether a replacement's result depends only on its input, with no side effects.
+
+    Conservative: replacements that involve references (which are stored and loaded) are never pure.
+    """
+    if isinstance(replacement, (
+        PlaceholderMarkerReplacement,
+        PlaceholderProtectionReplacement,
+        PlaceholderUnprotectionReplacement,
+        DeIndentationReplacement,
+    )):
+        return True
+
+    if isinstance(replacement, ReplacementSequence):
+        return all(is_pure_replacement(sequence_replacement) for sequence_replacement in replacement.replacements)
+
+    if isinstance(replacement, (OrdinaryDictionaryReplacement, RegexDictionaryReplacement)):
+        return all(
+            is_pure_replacement(concluding_replacement)
+            for concluding_replacement in replacement.concluding_replacements
+        )
+
+    return False
+
+
+def build_fused_translation_table(replacements: Sequence[Replacement]) -> Optional[dict[int, str]]:
+    """
+    Build a single `str.translate` table equivalent to applying replacements in order, if there is one.
+
+    There is one when there are replacements, and every one is an ordinary dictionary replacement
+    that has a translation table (see `OrdinaryDictionaryReplacement.build_translation_table`)
+    and is not gated by flags.
+    """
+    fused_translation_table = None
+
+    for replacement in replacements:
+        if not isinstance(replacement, OrdinaryDictionaryReplacement):
+            return None
+
+        if replacement.positive_flag_name is not None or replacement.negative_flag_name is not None:
+            return None
+
+        translation_table = replacement.build_translation_table()
+        if translation_table is None:
+            return None
+
+        if fused_translation_table is None:
+            fused_translation_table = translation_table
+        else:
+            fused_translation_table = compose_translation_tables(fused_translation_table, translation_table)
+
+    return fused_translation_table
+
+
+def build_replacements_applier(replacements: Sequence[Replacement],
+                               verbose_mode_enabled: bool) -> Callable[[str, Optional[int]], str]:
+    """
+    Build a function applying replacements in order, given the enabled flag bits (see `Replacement.apply`).
+
+    The replacements are fixed by `commit()`, so this is built once rather than per match.
+    Unless in verbose mode (where each application is printed),
+    the replacements are fused into one `str.translate` table where possible (see `build_fused_translation_table`).
+    """
+    translation_table = None if verbose_mode_enabled else build_fused_translation_table(replacements)
+
+    if translation_table is not None:
+        def apply_replacements(string: str, enabled_flag_bits: Optional[int]) -> str:
+            return string.translate(translation_table)
+    else:
+        def apply_replacements(string: str, enabled_flag_bits: Optional[int]) -> str:
+            for replacement in replacements:
+                string = replacement.apply(string, enabled_flag_bits)
+
+            return string
+
+    return apply_replacements
+
+
+def combine_attribute_specifications(attribute_specifications: str,
+                                     matched_attribute_specifications: Optional[str]) -> str:
+    """
+    Combine a replacement's attribute specifications with those matched (if any), the latter taking precedence.
+    """
+    if matched_attribute_specifications is None:
+        return attribute_specifications
+
+    return f'{attribute_specifications} {matched_attribute_specifications}'
+
+
+def build_enclosing_substitute_function(regex_pattern_compiled: re.Pattern,
+                                        flag_bit_from_letter: Optional[Mapping[str, int]],
+                                        attribute_specifications: Optional[str],
+                                        content_replacements: Sequence[Replacement],
+                                        tag_name: Optional[str], closing_tag_suffix: str,
+                                        concluding_replacements: Sequence[Replacement],
+                                        verbose_mode_enabled: bool) -> Callable[[re.Match], str]:
+    """
+    Build the substitute function for a replacement enclosing the matched content in a tag.
+
+    The `content` group has the content replacements applied, and is enclosed in a `tag_name` element
+    (unless None) with attributes from `attribute_specifications` and the `attribute_specifications` group,
+    before the concluding replacements are applied.
+    The replacements are gated by the `flags` group (see `ReplacementWithAllowedFlags`),
+    unless `flag_bit_from_letter` is None (for a replacement without `allowed_flags`).
+    Groups are accessed by number, which skips a name lookup per match.
+    """
+    has_flags = flag_bit_from_letter is not None and len(flag_bit_from_letter) > 0
+    apply_content_replacements = build_replacements_applier(content_replacements, verbose_mode_enabled)
+    apply_concluding_replacements = build_replacements_applier(concluding_replacements, verbose_mode_enabled)
+    group_index_from_name = regex_pattern_compiled.groupindex
+    attribute_specifications_group_index = group_index_from_name.get('attribute_specifications')
+    content_group_index = group_index_from_name['content']
+    opening_tag_start = f'<{tag_name}'
+    closing_tag = f'</{tag_name}>{closing_tag_suffix}'
+
+    def substitute_function(match: re.Match) -> str:
+        if has_flags:
+            enabled_flag_bits = ReplacementWithAllowedFlags.get_enabled_flag_bits(match, flag_bit_from_letter)
+        elif flag_bit_from_letter is not None:
+            enabled_flag_bits = 0
+        else:
+            enabled_flag_bits = None
+
+        content = apply_content_replacements(match.group(content_group_index), enabled_flag_bits)
+
+        if tag_name is None:
+            substitute = content
+        else:
+            if attribute_specifications is not None:
+                combined_attribute_specifications = combine_attribute_specifications(
+                    attribute_specifications,
+                    match.group(attribute_specifications_group_index),
+                )
+                attributes_sequence = build_attributes_sequence(combined_attribute_specifications, use_protection=True)
+            else:
+                attributes_sequence = ''
+
+            substitute = f'{opening_tag_start}{attributes_sequence}>{content}{closing_tag}'
+
+        return apply_concluding_replacements(substitute, enabled_flag_bits)
+
+    return substitute_function
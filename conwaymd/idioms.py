@@ -6,9 +6,12 @@ Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
 Common idioms.
 """
 
+import functools
 import re
+import string
 from typing import Iterable, Optional, Union
 
+from conwaymd.constants import ATTRIBUTES_SEQUENCE_CACHE_MAX_SIZE
 from conwaymd.placeholders import PlaceholderMaster
 from conwaymd.utilities import escape_attribute_value_html
 
@@ -63,43 +66,56 @@ BLOCK_TAG_NAMES = [
     'thead',
     'ul',
 ]
-
-
-def compute_attribute_specification_matches(attribute_specifications: str) -> Iterable[re.Match]:
-    return re.finditer(
-        pattern=r'''
-            [\s]*
+ATTRIBUTE_NAME_FROM_GROUP_NAME = {
+    'id_': 'id',
+    'class_': 'class',
+    'rowspan': 'rowspan',
+    'colspan': 'colspan',
+    'width': 'width',
+    'height': 'height',
+}
+VALUE_GROUP_NAMES = frozenset([
+    'double_quoted_value',
+    'single_quoted_value',
+    'bare_value',
+])
+ATTRIBUTE_SPECIFICATION_PATTERN_COMPILED = re.compile(
+    pattern=r'''
+        [\s]*
+        (?:
+            (?P<name> [^\s=]+ ) =
             (?:
-                (?P<name> [^\s=]+ ) =
-                (?:
-                    "(?P<double_quoted_value> [\s\S]*? )"
-                        |
-                    '(?P<single_quoted_value> [\s\S]*? )'
-                        |
-                    (?P<bare_value> [\S]* )
-                )
-                    |
-                [#] (?P<id_> [^\s"]+ )
-                    |
-                [.] (?P<class_> [^\s"]+ )
+                "(?P<double_quoted_value> [\s\S]*? )"
                     |
-                [r] (?P<rowspan> [0-9]+ )
+                '(?P<single_quoted_value> [\s\S]*? )'
                     |
-                [c] (?P<colspan> [0-9]+ )
-                    |
-                [w] (?P<width> [0-9]+ )
-                    |
-                [h] (?P<height> [0-9]+ )
-                    |
-                [-] (?P<delete_name> [\S]+ )
-                    |
-                (?P<boolean_name> [\S]+ )
-            ) ?
-            [\s]*
-        ''',
-        string=attribute_specifications,
-        flags=re.ASCII | re.VERBOSE,
-    )
+                (?P<bare_value> [\S]* )
+            )
+                |
+            [#] (?P<id_> [^\s"]+ )
+                |
+            [.] (?P<class_> [^\s"]+ )
+                |
+            [r] (?P<rowspan> [0-9]+ )
+                |
+            [c] (?P<colspan> [0-9]+ )
+                |
+            [w] (?P<width> [0-9]+ )
+                |
+            [h] (?P<height> [0-9]+ )
+                |
+            [-] (?P<delete_name> [\S]+ )
+                |
+            (?P<boolean_name> [\S]+ )
+        ) ?
+        [\s]*
+    ''',
+    flags=re.ASCII | re.VERBOSE,
+)
+
+
+def compute_attribute_specification_matches(attribute_specifications: str) -> Iterable[re.Match]:
+    return ATTRIBUTE_SPECIFICATION_PATTERN_COMPILED.finditer(attribute_specifications)
 
 
 def extract_attribute_name_and_value(attribute_specification_match: re.Match,
@@ -113,60 +129,27 @@ def extract_attribute_name_and_value(attribute_specification_match: re.Match,
     - («name»,) for an attribute to be omitted
     - None for an invalid attribute specification
     """
-    name = attribute_specification_match.group('name')
-    if name is not None:
-        try:
-            name = ATTRIBUTE_NAME_FROM_ABBREVIATION[name]
-        except KeyError:
-            pass
-
-        double_quoted_value = attribute_specification_match.group('double_quoted_value')
-        if double_quoted_value is not None:
-            return name, double_quoted_value
-
-        single_quoted_value = attribute_specification_match.group('single_quoted_value')
-        if single_quoted_value is not None:
-            return name, single_quoted_value
-
-        bare_value = attribute_specification_match.group('bare_value')
-        if bare_value is not None:
-            return name, bare_value
-
-    id_ = attribute_specification_match.group('id_')
-    if id_ is not None:
-        return 'id', id_
-
-    class_ = attribute_specification_match.group('class_')
-    if class_ is not None:
-        return 'class', class_
-
-    rowspan = attribute_specification_match.group('rowspan')
-    if rowspan is not None:
-        return 'rowspan', rowspan
-
-    colspan = attribute_specification_match.group('colspan')
-    if colspan is not None:
-        return 'colspan', colspan
+    group_name = attribute_specification_match.lastgroup  # the alternative that matched, in one lookup
+    if group_name is None:
+        return None
 
-    width = attribute_specification_match.group('width')
-    if width is not None:
-        return 'width', width
+    value = attribute_specification_match.group(group_name)
 
-    height = attribute_specification_match.group('height')
-    if height is not None:
-        return 'height', height
+    if group_name in VALUE_GROUP_NAMES:
+        name = attribute_specification_match.group('name')
+        name = ATTRIBUTE_NAME_FROM_ABBREVIATION.get(name, name)
+        return name, value
 
-    delete_name = attribute_specification_match.group('delete_name')
-    if delete_name is not None:
-        return delete_name,
+    if group_name == 'delete_name':
+        return value,
 
-    boolean_name = attribute_specification_match.group('boolean_name')
-    if boolean_name is not None:
-        return boolean_name, None
+    if group_name == 'boolean_name':
+        return value, None
 
-    return None
+    return ATTRIBUTE_NAME_FROM_GROUP_NAME[group_name], value
 
 
+@functools.lru_cache(maxsize=ATTRIBUTES_SEQUENCE_CACHE_MAX_SIZE)
 def build_attributes_sequence(attribute_specifications: Optional[str], use_protection: bool = False) -> str:
     """
     Convert CMD attribute specifications to an attribute sequence.
@@ -198,7 +181,15 @@ def build_attributes_sequence(attribute_specifications: Optional[str], use_prote
     except when `class` is specified multiple times, in which case the values will be appended.
     For example, `id=x #y .a .b name=value .=c class="d"` shall be converted to the attribute sequence
     ` id="y" class="a b c d" name="value"`.
+
+    Memoised, since the same attribute specifications (e.g. those of a rule with no matched specifications)
+    recur across matches and documents.
     """
+    if attribute_specifications is None or attribute_specifications.strip(string.whitespace) == '':  # nothing to parse
+        if use_protection:
+            return PlaceholderMaster.protect('')
+        return ''
+
     attribute_value_from_name: dict[str, str] = {}
 
     for attribute_specification_match in compute_attribute_specification_matches(attribute_specifications):
@@ -236,8 +227,47 @@ def build_attributes_sequence(attribute_specifications: Optional[str], use_prote
     return attribute_sequence
 
 
+def build_prefix_tree_regex(strings: Iterable[str]) -> str:
+    """
+    Build a regex matching exactly the given strings, with shared prefixes factored out.
+
+    For example, `['dd', 'div', 'dl', 'p', 'pre']` gives `(?: d(?: iv | [dl] ) | p(?: re )? )`.
+    Since `re` tries the alternatives of an alternation one after another,
+    factoring out prefixes means that each character of a candidate is tested against fewer alternatives.
+    The strings must be non-empty.
+    """
+    strings = sorted(set(strings))
+    tails_from_head = {}
+    for string_ in strings:
+        tails_from_head.setdefault(string_[0], []).append(string_[1:])
+
+    branch_regexes = []
+    single_character_heads = []
+    for head, tails in tails_from_head.items():
+        non_empty_tails = [tail for tail in tails if tail != '']
+        if len(non_empty_tails) == 0:
+            single_character_heads.append(head)
+            continue
+
+        tails_regex = build_prefix_tree_regex(non_empty_tails)
+        if '' in tails:
+            tails_regex = f'(?: {tails_regex} )?'
+        branch_regexes.append(f'{re.escape(head)}{tails_regex}')
+
+    if len(single_character_heads) == 1:
+        branch_regexes.append(re.escape(single_character_heads[0]))
+    elif len(single_character_heads) > 1:
+        branch_regexes.append(f"[{''.join(re.escape(head) for head in single_character_heads)}]")
+
+    if len(branch_regexes) == 1:
+        return branch_regexes[0]
+
+    return f"(?: {' | '.join(branch_regexes)} )"
+
+
+@functools.cache
 def build_block_tag_regex(require_anchoring: bool) -> str:
-    block_tag_name_regex = '|'.join(re.escape(tag_name) for tag_name in BLOCK_TAG_NAMES)
+    block_tag_name_regex = build_prefix_tree_regex(BLOCK_TAG_NAMES)
     after_tag_name_regex = fr'[\s{PlaceholderMaster.MARKER}>]'
     block_tag_regex = f'[<] [/]? (?: {block_tag_name_regex} ) {after_tag_name_regex}'
 
@@ -303,12 +333,19 @@ def build_attribute_specifications_regex(attribute_specifications: Optional[str]
     return braced_sequence_regex + block_newline_regex
 
 
-def build_captured_character_class_regex(characters: set[str], capture_group_name: str) -> Optional[str]:
+def build_character_class_regex(characters: set[str]) -> Optional[str]:
     if len(characters) == 0:
         return None
 
     characters_escaped = ''.join(re.escape(character) for character in sorted(characters))
-    character_class_regex = f'[{characters_escaped}]'
+
+    return f'[{characters_escaped}]'
+
+
+def build_captured_character_class_regex(characters: set[str], capture_group_name: str) -> Optional[str]:
+    character_class_regex = build_character_class_regex(characters)
+    if character_class_regex is None:
+        return None
 
     return f'(?P<{capture_group_name}> {character_class_regex} )'
 
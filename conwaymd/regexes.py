@@ -0,0 +1,29 @@
+"""
+# Conway-Markdown: regexes.py
+
+Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
+
+Regex compilation for replacement rules.
+
+Replacement rules compile their patterns via `compile_regex` rather than calling `re.compile` directly,
+so that how patterns are compiled is decided in one place.
+The backend is Python's `re`, since CMD replacement rules are specified in Python regex syntax;
+other engines (e.g. PCRE2) differ in ways that would change the meaning of existing rules
+(`\\Z` allowing a trailing newline, substitute template syntax for `match.expand`, etc.).
+
+Compiled patterns are interned per (pattern, flags),
+so that rules sharing a pattern (e.g. the same delimiters across similar rules, or the standard rules
+re-legislated for every CMD file in a process) share one compiled object.
+This cache is separate from (and larger than) the one in `re`,
+so it is not evicted by other regex use.
+"""
+
+import functools
+import re
+
+from conwaymd.constants import COMPILED_REGEX_CACHE_MAX_SIZE
+
+
+@functools.lru_cache(maxsize=COMPILED_REGEX_CACHE_MAX_SIZE)
+def compile_regex(pattern: str, flags: re.RegexFlag = re.NOFLAG) -> re.Pattern:
+    return re.compile(pattern=pattern, flags=flags)
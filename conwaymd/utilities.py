@@ -9,18 +9,50 @@ Common utility functions.
 import re
 from typing import Optional
 
+TRAILING_WHITESPACE_ONLY_LINE_PATTERN_COMPILED = re.compile(
+    pattern=r'^ [^\S\n]+ \Z',
+    flags=re.ASCII | re.MULTILINE | re.VERBOSE,
+)
+INDENTATION_PATTERN_COMPILED = re.compile(
+    pattern=r'^ [^\S\n]+ | ^ (?! $ )',
+    flags=re.ASCII | re.MULTILINE | re.VERBOSE,
+)
+
+
+def compose_translation_tables(first_table: dict[int, str], second_table: dict[int, str]) -> dict[int, str]:
+    """
+    Compose two `str.translate` tables.
+
+    Translating with the result is equivalent to translating with `first_table` and then with `second_table`.
+    """
+    composed_table = {
+        code_point: substitute.translate(second_table)
+        for code_point, substitute in first_table.items()
+    }
+    for code_point, substitute in second_table.items():
+        composed_table.setdefault(code_point, substitute)
+
+    return composed_table
+
 
 def compute_longest_common_prefix(strings: list[str]) -> str:
-    shortest_string = min(strings, key=len, default='')
+    """
+    Compute the longest common prefix of strings.
+
+    This is the longest common prefix of the lexicographically least and greatest strings,
+    since every string sorts between them.
+    """
+    if len(strings) == 0:
+        return ''
 
-    prefix = shortest_string
-    while len(prefix) > 0:
-        if all(string.startswith(prefix) for string in strings):
-            break
+    least_string = min(strings)
+    greatest_string = max(strings)
 
-        prefix = prefix[:-1]
+    for index, character in enumerate(least_string):
+        if character != greatest_string[index]:
+            return least_string[:index]
 
-    return prefix
+    return least_string
 
 
 def de_indent(string: str) -> str:
@@ -36,17 +68,14 @@ def de_indent(string: str) -> str:
     even those lines which are not the last line.
     """
     string = re.sub(
-        pattern=r'^ [^\S\n]+ \Z',
+        pattern=TRAILING_WHITESPACE_ONLY_LINE_PATTERN_COMPILED,
         repl='',
         string=string,
-        flags=re.ASCII | re.MULTILINE | re.VERBOSE,
-    )
-    indentations = re.findall(
-        pattern=r'^ [^\S\n]+ | ^ (?! $ )',
-        string=string,
-        flags=re.ASCII | re.MULTILINE | re.VERBOSE,
     )
+    indentations = INDENTATION_PATTERN_COMPILED.findall(string)
     longest_common_indentation = compute_longest_common_prefix(indentations)
+    if longest_common_indentation == '':  # nothing to remove
+        return string
 
     string = re.sub(
         pattern=f'^ {re.escape(longest_common_indentation)}',
@@ -8,10 +8,33 @@ Perform unit testing for `authorities.py`.
 
 import unittest
 
-from conwaymd.authorities import extract_basename, make_clean_url
+from conwaymd.authorities import classify_rules_lines, extract_basename, make_clean_url
 
 
 class TestAuthorities(unittest.TestCase):
+    def test_classify_rules_lines(self):
+        rules = '''\
+# A comment
+OrdinaryDictionaryReplacement: #test
+- queue_position: ROOT
+* a --> b
+  continued
+
+! invalid
+'''
+        self.assertEqual(
+            [(line_number, line_type) for line_number, line_type, _ in classify_rules_lines(rules)],
+            [
+                (1, 'COMMENT'),
+                (2, 'CLASS_DECLARATION'),
+                (3, 'ATTRIBUTE_DECLARATION'),
+                (4, 'SUBSTITUTION_DECLARATION'),
+                (5, 'CONTINUATION'),
+                (6, 'BLANK'),
+                (7, 'INVALID'),
+            ],
+        )
+
     def test_extract_basename(self):
         self.assertEqual(extract_basename('path/to/cmd_name'), 'cmd_name')
 
@@ -6,17 +6,50 @@ Licensed under "MIT No Attribution" (MIT-0), see LICENSE.
 Perform unit testing for `cli.py`.
 """
 
+import concurrent.futures
 import os
+import tempfile
 import unittest
 
-from conwaymd.cli import extract_cmd_name, is_cmd_file
+from conwaymd.authorities import classify_rules_lines
+from conwaymd.cli import (
+    compute_cache_file_name,
+    convert_walked_cmd_file_in_worker,
+    extract_cmd_name,
+    extract_walked_cmd_name,
+    is_cmd_file,
+    map_lazily_in_order,
+    prune_html_cache,
+    walk_cmd_file_names,
+)
+from conwaymd.constants import GENERIC_ERROR_EXIT_CODE
 
 
 class TestCli(unittest.TestCase):
+    def test_compute_cache_file_name(self):
+        no_rules_lines = tuple(classify_rules_lines(''))
+        cache_file_name = compute_cache_file_name(no_rules_lines, b'Content', 'file.cmd')
+        self.assertEqual(cache_file_name, compute_cache_file_name(no_rules_lines, b'Content', 'file.cmd'))
+        self.assertNotEqual(cache_file_name, compute_cache_file_name(no_rules_lines, b'Other', 'file.cmd'))
+        self.assertNotEqual(cache_file_name, compute_cache_file_name(no_rules_lines, b'Content', 'other.cmd'))
+
+        inclusion_rules_lines = tuple(classify_rules_lines('< included.txt\n'))
+        self.assertIsNone(compute_cache_file_name(inclusion_rules_lines, b'< included.txt\n%%%\nContent', 'file.cmd'))
+
+    def test_convert_walked_cmd_file_in_worker(self):
+        missing_cmd_file_name = os.path.join(os.curdir, 'missing-directory', 'missing.cmd')
+        converted, error_output, exit_code = convert_walked_cmd_file_in_worker(missing_cmd_file_name,
+                                                                               cache_mode_enabled=False)
+        self.assertIsNone(converted)
+        self.assertIn('FileNotFoundError', error_output)
+        self.assertEqual(exit_code, GENERIC_ERROR_EXIT_CODE)
+
     def test_extract_cmd_name(self):
         self.assertEqual(extract_cmd_name('file.cmd'), 'file')
         self.assertEqual(extract_cmd_name('file.'), 'file')
         self.assertEqual(extract_cmd_name('file'), 'file')
+        self.assertEqual(extract_cmd_name('file.cmd.cmd'), 'file.cmd')
+        self.assertEqual(extract_cmd_name('file.cmd.'), 'file.cmd')
 
         if os.sep == '/':
             self.assertEqual(extract_cmd_name('./././file.cmd'), 'file')
@@ -29,6 +62,17 @@ class TestCli(unittest.TestCase):
             self.assertEqual(extract_cmd_name(r'.\file.'), 'file')
             self.assertEqual(extract_cmd_name(r'.\file'), 'file')
 
+    def test_extract_walked_cmd_name(self):
+        self.assertEqual(extract_walked_cmd_name(os.path.join(os.curdir, 'file.cmd')), 'file')
+        self.assertEqual(
+            extract_walked_cmd_name(os.path.join(os.curdir, 'dir', 'file.cmd')),
+            os.path.join('dir', 'file'),
+        )
+        self.assertEqual(
+            extract_walked_cmd_name(os.path.join(os.curdir, 'dir', 'file.cmd')),
+            extract_cmd_name(os.path.join(os.curdir, 'dir', 'file.cmd')),
+        )
+
     def test_is_cmd_file(self):
         self.assertTrue(is_cmd_file('file.cmd'))
         self.assertTrue(is_cmd_file('.cmd'))
@@ -36,6 +80,53 @@ class TestCli(unittest.TestCase):
         self.assertFalse(is_cmd_file('file.'))
         self.assertFalse(is_cmd_file('file'))
 
+    def test_map_lazily_in_order(self):
+        taken_arguments = []
+
+        def generate_arguments():
+            for argument in range(10):
+                taken_arguments.append(argument)
+                yield argument
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = map_lazily_in_order(executor, lambda argument: argument ** 2, generate_arguments(), buffer_size=3)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(taken_arguments, [0, 1, 2])
+            self.assertEqual(list(results), [argument ** 2 for argument in range(1, 10)])
+
+    def test_prune_html_cache(self):
+        with tempfile.TemporaryDirectory() as directory_name:
+            for index, base_name in enumerate(['old.html', 'middle.html', 'new.html']):
+                file_name = os.path.join(directory_name, base_name)
+                with open(file_name, 'wb') as file:
+                    file.write(b'x' * 10)
+                os.utime(file_name, (index, index))
+
+            prune_html_cache(directory_name, max_byte_count=20)
+            self.assertEqual(sorted(os.listdir(directory_name)), ['middle.html', 'new.html'])
+
+            prune_html_cache(directory_name, max_byte_count=20)
+            self.assertEqual(sorted(os.listdir(directory_name)), ['middle.html', 'new.html'])
+
+            prune_html_cache(directory_name, max_byte_count=0)
+            self.assertEqual(os.listdir(directory_name), [])
+
+    def test_walk_cmd_file_names(self):
+        with tempfile.TemporaryDirectory() as directory_name:
+            for relative_file_name in ['z.cmd', 'a.txt', os.path.join('b', 'y.cmd'), os.path.join('a', 'x.cmd')]:
+                file_name = os.path.join(directory_name, relative_file_name)
+                os.makedirs(os.path.dirname(file_name), exist_ok=True)
+                open(file_name, 'w').close()
+
+            self.assertEqual(
+                list(walk_cmd_file_names(directory_name)),
+                [
+                    os.path.join(directory_name, 'a', 'x.cmd'),
+                    os.path.join(directory_name, 'b', 'y.cmd'),
+                    os.path.join(directory_name, 'z.cmd'),
+                ],
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
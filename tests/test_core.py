@@ -15,12 +15,15 @@ from conwaymd.core import cmd_to_html
 
 class TestCore(unittest.TestCase):
     def test_extract_rules_and_content(self):
-        self.assertEqual(extract_rules_and_content(''), (None, ''))
-        self.assertEqual(extract_rules_and_content('abc'), (None, 'abc'))
-        self.assertEqual(extract_rules_and_content('%%%abc'), (None, '%%%abc'))
-        self.assertEqual(extract_rules_and_content('abc%%%'), (None, 'abc%%%'))
+        self.assertEqual(extract_rules_and_content(''), ('', ''))
+        self.assertEqual(extract_rules_and_content('abc'), ('', 'abc'))
+        self.assertEqual(extract_rules_and_content('%%%abc'), ('', '%%%abc'))
+        self.assertEqual(extract_rules_and_content('abc%%%'), ('', 'abc%%%'))
         self.assertEqual(extract_rules_and_content('%%%\nabc'), ('', 'abc'))
-        self.assertEqual(extract_rules_and_content('X%%\nY'), (None, 'X%%\nY'))
+        self.assertEqual(extract_rules_and_content('X%%\nY'), ('', 'X%%\nY'))
+        self.assertEqual(extract_rules_and_content('A\n%%%'), ('', 'A\n%%%'))
+        self.assertEqual(extract_rules_and_content('A\n%% %\nB'), ('', 'A\n%% %\nB'))
+        self.assertEqual(extract_rules_and_content('A\n%%%%\n'), ('A\n', ''))
         self.assertEqual(
             extract_rules_and_content('This be the preamble.\nEven two lines of preamble.\n%%%%%\nYea.\n'),
             ('This be the preamble.\nEven two lines of preamble.\n', 'Yea.\n'),
@@ -29,10 +32,15 @@ class TestCore(unittest.TestCase):
             extract_rules_and_content('ABC\n%%%\n123\n%%%%%%%\nXYZ'),
             ('ABC\n', '123\n%%%%%%%\nXYZ'),
         )
+        self.assertEqual(extract_rules_and_content(b'abc'), (b'', b'abc'))
+        self.assertEqual(extract_rules_and_content('R\n%%%\n\u00e9'.encode()), (b'R\n', '\u00e9'.encode()))
 
     def test_extract_separator_normalised_cmd_name(self):
         self.assertEqual(extract_separator_normalised_cmd_name('path/to/cmd_name.cmd'), 'path/to/cmd_name')
         self.assertEqual(extract_separator_normalised_cmd_name(r'path\to\cmd_name.cmd'), 'path/to/cmd_name')
+        self.assertEqual(extract_separator_normalised_cmd_name('cmd_name.cmd.cmd'), 'cmd_name.cmd')
+        self.assertEqual(extract_separator_normalised_cmd_name('cmd_name.txt'), 'cmd_name.txt')
+        self.assertEqual(extract_separator_normalised_cmd_name(None), '')
 
     def test_cmd_to_html(self):
         self.assertEqual(
@@ -15,10 +15,15 @@ from conwaymd.employables import (
     InlineAssortedDelimitersReplacement,
     OrdinaryDictionaryReplacement,
     PartitioningReplacement,
+    PlaceholderProtectionReplacement,
     ReferenceDefinitionReplacement,
     ReferencedImageReplacement,
     SpecifiedImageReplacement,
+    build_fused_translation_table,
+    is_pure_replacement,
 )
+from conwaymd.placeholders import PlaceholderMaster
+from conwaymd.references import ReferenceMaster
 
 
 class TestEmployables(unittest.TestCase):
@@ -142,8 +147,8 @@ class TestEmployables(unittest.TestCase):
             ),
             r'[|]?'
             r'(?P<delimiter> '
-            r'(?P<delimiter_character> (?P<either> [\*_] ) )'
-            r' (?(either) (?P=either)? )'
+            r'(?P<delimiter_character> [\*_] )'
+            r' (?P=delimiter_character)?'
             r' )'
             r'(?! [\s] | [<][/] )'
             r'(?: \{ (?P<attribute_specifications> [^}]*? ) \} )?'
@@ -165,7 +170,7 @@ class TestEmployables(unittest.TestCase):
             r'[|]?'
             r'(?P<delimiter> '
             r'(?P<delimiter_character> '
-            r'(?P<double> ["] ) | (?P<either> [\*] ) | (?P<single> [_] )'
+            r'(?P<double> ["] ) | (?P<either> [\*] ) | [_]'
             r' )'
             r' (?(double) (?P=double) | (?(either) (?P=either)? ) )'
             r' )'
@@ -175,6 +180,116 @@ class TestEmployables(unittest.TestCase):
             r'(?<! [\s] | [|] )'
             r'(?P=delimiter)',
         )
+        self.assertEqual(
+            InlineAssortedDelimitersReplacement.build_regex_pattern(
+                tag_name_from_delimiter_length_from_character={
+                    '~': {1: 's'},
+                },
+                attribute_specifications=None,
+                prohibited_content_regex=None,
+            ),
+            r'[|]?'
+            r'(?P<delimiter> (?P<delimiter_character> [\~] )  )'
+            r'(?! [\s] | [<][/] )'
+            r'[\s]*'
+            r'(?P<content> (?: (?! (?P=delimiter_character) ) [\s\S] )+? )'
+            r'(?<! [\s] | [|] )'
+            r'(?P=delimiter)',
+        )
+
+    def test_ordinary_dictionary_replacement_apply(self):
+        for apply_substitutions_simultaneously, expected_string in [(True, 'bc-xyz'), (False, 'cc-xyz')]:
+            single_character_replacement = OrdinaryDictionaryReplacement('single', verbose_mode_enabled=False)
+            single_character_replacement.apply_substitutions_simultaneously = apply_substitutions_simultaneously
+            single_character_replacement.add_substitution('a', 'b')
+            single_character_replacement.add_substitution('b', 'c')
+            single_character_replacement.add_substitution('-', '-xyz')
+            single_character_replacement.commit(flag_bit_from_name={})
+            self.assertEqual(single_character_replacement.apply('ab-'), expected_string)
+
+        multiple_character_replacement = OrdinaryDictionaryReplacement('multiple', verbose_mode_enabled=False)
+        multiple_character_replacement.add_substitution('<<', '&laquo;')
+        multiple_character_replacement.add_substitution('>>', '&raquo;')
+        multiple_character_replacement.commit(flag_bit_from_name={})
+        self.assertEqual(multiple_character_replacement.apply('no guillemets'), 'no guillemets')
+        self.assertEqual(multiple_character_replacement.apply('a <<b>> c'), 'a &laquo;b&raquo; c')
+
+    def test_ordinary_dictionary_replacement_substitutions_are_independent(self):
+        self.assertTrue(OrdinaryDictionaryReplacement.substitutions_are_independent({}))
+        self.assertTrue(OrdinaryDictionaryReplacement.substitutions_are_independent({'<<': '&laquo;', '>>': '&raquo;'}))
+        self.assertTrue(OrdinaryDictionaryReplacement.substitutions_are_independent({'ab': 'x', 'cd': 'a'}))
+        self.assertFalse(OrdinaryDictionaryReplacement.substitutions_are_independent({'a': 'b', 'b': 'c'}))
+        self.assertFalse(OrdinaryDictionaryReplacement.substitutions_are_independent({'a': '', 'xy': 'z'}))
+        self.assertFalse(OrdinaryDictionaryReplacement.substitutions_are_independent({'ab': 'x', 'bc': 'y'}))
+        self.assertFalse(OrdinaryDictionaryReplacement.substitutions_are_independent({'--': 'x', '---': 'y'}))
+
+        substitute_from_pattern = {'ab': 'x', 'cd': 'a'}
+        substitute_from_pattern |= {f'<{digit}>': f'({digit})' for digit in range(10)}  # enough to be fused
+        for apply_substitutions_simultaneously in [True, False]:
+            independent_replacement = OrdinaryDictionaryReplacement('independent', verbose_mode_enabled=False)
+            independent_replacement.apply_substitutions_simultaneously = apply_substitutions_simultaneously
+            for pattern, substitute in substitute_from_pattern.items():
+                independent_replacement.add_substitution(pattern, substitute)
+            independent_replacement.commit(flag_bit_from_name={})
+
+            for string in ['', 'abd', 'cdb', 'abcdcabd', '<1><2>ab<<3>>']:
+                expected_string = string
+                for pattern, substitute in substitute_from_pattern.items():
+                    expected_string = expected_string.replace(pattern, substitute)
+                self.assertEqual(independent_replacement.apply(string), expected_string)
+
+    def test_ordinary_dictionary_replacement_apply_concluding_replacements(self):
+        protection_replacement = PlaceholderProtectionReplacement('protect', verbose_mode_enabled=False)
+        protection_replacement.commit(flag_bit_from_name={})
+        reference_master = ReferenceMaster()
+        reference_replacement = ReferenceDefinitionReplacement('references', reference_master,
+                                                               verbose_mode_enabled=False)
+        self.assertTrue(is_pure_replacement(protection_replacement))
+        self.assertFalse(is_pure_replacement(reference_replacement))
+
+        concluded_replacement = OrdinaryDictionaryReplacement('concluded', verbose_mode_enabled=False)
+        concluded_replacement.add_substitution('<', '&lt;')
+        concluded_replacement.concluding_replacements = [protection_replacement]
+        concluded_replacement.commit(flag_bit_from_name={})
+        self.assertTrue(is_pure_replacement(concluded_replacement))
+        self.assertEqual(
+            concluded_replacement.apply('a < b < c'),
+            'a \uF8FF\uE026\uE06C\uE074\uE03B\uF8FF b \uF8FF\uE026\uE06C\uE074\uE03B\uF8FF c',
+        )
+
+    def test_build_fused_translation_table(self):
+        self.assertIsNone(build_fused_translation_table([]))
+
+        first_replacement = OrdinaryDictionaryReplacement('first', verbose_mode_enabled=False)
+        first_replacement.add_substitution('a', 'b')
+        first_replacement.commit(flag_bit_from_name={})
+        second_replacement = OrdinaryDictionaryReplacement('second', verbose_mode_enabled=False)
+        second_replacement.add_substitution('b', 'c')
+        second_replacement.commit(flag_bit_from_name={})
+        self.assertEqual(build_fused_translation_table([first_replacement, second_replacement]), {97: 'c', 98: 'c'})
+
+        gated_replacement = OrdinaryDictionaryReplacement('gated', verbose_mode_enabled=False)
+        gated_replacement.negative_flag_name = 'KEEP_HTML_UNESCAPED'
+        gated_replacement.add_substitution('<', '&lt;')
+        gated_replacement.commit(flag_bit_from_name={})
+        self.assertIsNone(build_fused_translation_table([first_replacement, gated_replacement]))
+
+        fixed_delimiters_replacement = FixedDelimitersReplacement('fixed', verbose_mode_enabled=False)
+        fixed_delimiters_replacement.syntax_type_is_block = False
+        fixed_delimiters_replacement.opening_delimiter = '('
+        fixed_delimiters_replacement.closing_delimiter = ')'
+        fixed_delimiters_replacement.content_replacements = [first_replacement, second_replacement]
+        fixed_delimiters_replacement.tag_name = 'span'
+        fixed_delimiters_replacement.commit(flag_bit_from_name={})
+        self.assertEqual(fixed_delimiters_replacement.apply('ab (ab)'), 'ab <span>cc</span>')
+        self.assertEqual(fixed_delimiters_replacement.apply('ab (ab'), 'ab (ab')
+        self.assertEqual(fixed_delimiters_replacement.apply('ab ab)'), 'ab ab)')
+
+    def test_replacement_slots(self):
+        fixed_delimiters_replacement = FixedDelimitersReplacement('fixed', verbose_mode_enabled=False)
+        self.assertFalse(hasattr(fixed_delimiters_replacement, '__dict__'))
+        self.assertIn('_flag_name_from_letter', FixedDelimitersReplacement.__slots__)
+        self.assertIn('_opening_delimiter', FixedDelimitersReplacement.__slots__)
 
     def test_ordinary_dictionary_replacement_build_regex_pattern(self):
         self.assertEqual(
@@ -285,6 +400,24 @@ class TestEmployables(unittest.TestCase):
             r'(?: \[ [\s]* (?P<label> [^\]]*? ) [\s]* \] )?',
         )
 
+    def test_referenced_image_replacement_apply(self):
+        reference_master = ReferenceMaster()
+        replacement = ReferencedImageReplacement('images', reference_master, verbose_mode_enabled=False)
+        replacement.commit(flag_bit_from_name={})
+
+        reference_master.store_definition('a', attribute_specifications=None, uri='a.png', title='')
+        self.assertEqual(
+            PlaceholderMaster.unprotect(replacement.apply('![x][a] ![y][A] ![z][b]')),
+            '<img alt="x" src="a.png" title=""> <img alt="y" src="a.png" title=""> ![z][b]',
+        )
+
+        reference_master.store_definition('a', attribute_specifications=None, uri='aa.png', title='')
+        reference_master.store_definition('b', attribute_specifications=None, uri='b.png', title='')
+        self.assertEqual(
+            PlaceholderMaster.unprotect(replacement.apply('![x][a] ![z][b]')),
+            '<img alt="x" src="aa.png" title=""> <img alt="z" src="b.png" title="">',
+        )
+
     def test_specified_image_replacement_build_regex_pattern(self):
         self.assertEqual(
             SpecifiedImageReplacement.build_regex_pattern(
@@ -8,7 +8,13 @@ Perform unit testing for `idioms.py`.
 
 import unittest
 
-from conwaymd.idioms import build_attributes_sequence, build_extensible_delimiter_opening_regex, build_flags_regex
+from conwaymd.idioms import (
+    build_attributes_sequence,
+    build_extensible_delimiter_opening_regex,
+    build_flags_regex,
+    build_prefix_tree_regex,
+)
+from conwaymd.placeholders import PlaceholderMaster
 
 
 class TestIdioms(unittest.TestCase):
@@ -16,6 +22,9 @@ class TestIdioms(unittest.TestCase):
         self.assertEqual(build_attributes_sequence(''), '')
         self.assertEqual(build_attributes_sequence('  '), '')
         self.assertEqual(build_attributes_sequence('\t'), '')
+        self.assertEqual(build_attributes_sequence(' ', use_protection=True), PlaceholderMaster.protect(''))
+        self.assertEqual(build_attributes_sequence(None), '')
+        self.assertEqual(build_attributes_sequence(' \xa0'), ' \xa0')
         self.assertEqual(build_attributes_sequence('   \n name=value\n    '), ' name="value"')
         self.assertEqual(build_attributes_sequence(' empty1="" empty2=  boolean'), ' empty1="" empty2="" boolean')
         self.assertEqual(
@@ -55,6 +64,16 @@ class TestIdioms(unittest.TestCase):
             '(?P<flags> [uwi]* )',
         )
 
+    def test_build_prefix_tree_regex(self):
+        self.assertEqual(build_prefix_tree_regex(['p']), 'p')
+        self.assertEqual(build_prefix_tree_regex(['ol', 'ul', 'li']), '(?: li | ol | ul )')
+        self.assertEqual(build_prefix_tree_regex(['p', 'pre', 'hr', 'h1', 'h2']), '(?: h[12r] | p(?: re )? )')
+        self.assertEqual(
+            build_prefix_tree_regex(['dd', 'details', 'dialog', 'div', 'dl', 'dt']),
+            'd(?: etails | i(?: alog | v ) | [dlt] )',
+        )
+        self.assertEqual(build_prefix_tree_regex(['a.b', 'a*']), r'a(?: \.b | \* )')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,6 +12,17 @@ from conwaymd.placeholders import PlaceholderMaster
 
 
 class TestPlaceholders(unittest.TestCase):
+    def test_placeholder_master_replace_marker_occurrences(self):
+        self.assertEqual(PlaceholderMaster.replace_marker_occurrences('abc'), 'abc')
+        self.assertEqual(
+            PlaceholderMaster.replace_marker_occurrences('a\uF8FFb'),
+            'a\uF8FF\uE0EF\uE0A3\uE0BF\uF8FFb',
+        )
+        self.assertEqual(
+            PlaceholderMaster.unprotect(PlaceholderMaster.replace_marker_occurrences('a\uF8FFb')),
+            'a\uF8FFb',
+        )
+
     def test_placeholder_master_protect(self):
         self.assertEqual(PlaceholderMaster.protect(''), '\uF8FF\uF8FF')
         self.assertEqual(PlaceholderMaster.protect('$'), '\uF8FF\uE024\uF8FF')
@@ -9,6 +9,7 @@ Perform unit testing for `utilities.py`.
 import unittest
 
 from conwaymd.utilities import (
+    compose_translation_tables,
     compute_longest_common_prefix,
     de_indent,
     escape_attribute_value_html,
@@ -17,6 +18,17 @@ from conwaymd.utilities import (
 
 
 class TestUtilities(unittest.TestCase):
+    def test_compose_translation_tables(self):
+        self.assertEqual(compose_translation_tables({}, {}), {})
+        self.assertEqual(
+            compose_translation_tables({ord('a'): 'b'}, {ord('b'): 'c'}),
+            {ord('a'): 'c', ord('b'): 'c'},
+        )
+        self.assertEqual(
+            compose_translation_tables({ord('<'): '&lt;', ord('x'): ''}, {ord('&'): '&amp;', ord('x'): 'y'}),
+            {ord('<'): '&amp;lt;', ord('x'): '', ord('&'): '&amp;'},
+        )
+
     def test_compute_longest_common_prefix(self):
         self.assertEqual(compute_longest_common_prefix([]), '')
         self.assertEqual(compute_longest_common_prefix(['a', 'b', 'c', 'd']), '')